@@ -0,0 +1,137 @@
+"""
+Deterministic synthetic corpus for the core.tools benchmarks.
+
+Every file is generated from a fixed seed, so two runs on any machine
+produce byte-identical inputs and timings stay comparable.
+"""
+
+import json
+import os
+import random
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+# Bump when a generator changes so stale corpora are rebuilt
+CORPUS_VERSION = 1
+SEED = 1234
+
+WORDS = (
+    "agreement party shall term payment invoice notice clause liability "
+    "period total amount service delivery schedule provided hereby section "
+    "report revenue quarter balance asset account statement annual board"
+).split()
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_text_pdf(path, rng, pages=40):
+    """Dense running text, several paragraphs per page."""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        paragraphs = ["\n".join(_sentence(rng) for _ in range(6)) for _ in range(6)]
+        page.insert_textbox(page.rect + (50, 50, -50, -50), "\n\n".join(paragraphs), fontsize=9)
+    doc.save(path, deflate=True)
+    doc.close()
+
+
+def make_table_pdf(path, rng, pages=20, rows=40, cols=6):
+    """Pages of aligned numeric columns, like a financial statement."""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        for r in range(rows):
+            y = 60 + r * 17
+            page.insert_text((50, y), rng.choice(WORDS).title(), fontsize=9)
+            for c in range(cols):
+                value = f"{rng.uniform(-99999, 99999):,.2f}"
+                page.insert_text((150 + c * 70, y), value, fontsize=9)
+    doc.save(path, deflate=True)
+    doc.close()
+
+
+def make_image_pdf(path, rng, pages=8, side=1600):
+    """Scanned-style pages: one large photographic image each."""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        img = _noisy_image(rng, side, side)
+        pix = fitz.Pixmap(fitz.csRGB, side, side, img.tobytes(), 0)
+        page.insert_image(page.rect, pixmap=pix)
+    doc.save(path, deflate=True)
+    doc.close()
+
+
+def make_many_page_pdf(path, rng, pages=1000):
+    """Long document with a short line of text per page."""
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}", fontsize=14)
+        page.insert_text((72, 100), _sentence(rng), fontsize=9)
+    doc.save(path, deflate=True)
+    doc.close()
+
+
+def _noisy_image(rng, width, height):
+    """Smooth gradient plus deterministic noise, so JPEG/Flate behave like photos."""
+    base = Image.linear_gradient('L').resize((width, height))
+    noise = Image.frombytes('L', (width, height), rng.randbytes(width * height))
+    r = Image.blend(base, noise, 0.25)
+    g = Image.blend(base.rotate(90), noise, 0.25)
+    b = Image.blend(base.rotate(180), noise, 0.25)
+    return Image.merge('RGB', (r, g, b))
+
+
+def make_images(directory, rng, count=12, side=3000):
+    """Large phone-photo JPEGs plus RGBA PNGs that need compositing."""
+    paths = []
+    for i in range(count):
+        img = _noisy_image(rng, side, side * 3 // 4)
+        if i % 4 == 3:
+            path = os.path.join(directory, f"photo_{i:02d}.png")
+            img.putalpha(200)
+            img.save(path, 'PNG')
+        else:
+            path = os.path.join(directory, f"photo_{i:02d}.jpg")
+            img.save(path, 'JPEG', quality=90)
+        paths.append(path)
+    return paths
+
+
+def build_corpus(directory):
+    """
+    Create the corpus in `directory` unless an up-to-date one is already there.
+
+    Returns:
+        dict mapping corpus names to file paths (lists for image sets)
+    """
+    manifest_path = os.path.join(directory, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == CORPUS_VERSION:
+            return manifest['files']
+
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(SEED)
+    files = {
+        'text': os.path.join(directory, 'text_heavy.pdf'),
+        'table': os.path.join(directory, 'table_heavy.pdf'),
+        'image': os.path.join(directory, 'image_heavy.pdf'),
+        'many_pages': os.path.join(directory, 'many_pages.pdf'),
+    }
+    make_text_pdf(files['text'], rng)
+    make_table_pdf(files['table'], rng)
+    make_image_pdf(files['image'], rng)
+    make_many_page_pdf(files['many_pages'], rng)
+    image_dir = os.path.join(directory, 'images')
+    os.makedirs(image_dir, exist_ok=True)
+    files['images'] = make_images(image_dir, rng)
+
+    with open(manifest_path, 'w') as f:
+        json.dump({'version': CORPUS_VERSION, 'files': files}, f, indent=2)
+    return files
@@ -0,0 +1,85 @@
+"""
+Peak memory measurement shared by the benchmark scripts.
+"""
+
+import multiprocessing
+import queue as queue_module
+import resource
+import time
+
+
+def peak_rss_mb(pid='self') -> float:
+    """
+    Peak resident set size of a process (default: this one) in MB.
+
+    Linux carries ru_maxrss across fork/exec, so a spawned child would report
+    its parent's peak; VmHWM is per address space and starts fresh at exec.
+    Other processes can only be read from /proc; they count as 0 elsewhere.
+    """
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid != 'self':
+        return 0.0
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if peak > 1 << 32 else peak / 1024
+
+
+def pool_peak_rss_mb() -> float:
+    """
+    Peak RSS of the tools' shared worker pool in MB, summed over its
+    workers, then shut the pool down.
+
+    The workers run side by side, so the sum bounds their combined peak.
+    They are forkserver children, which getrusage(RUSAGE_CHILDREN) never
+    sees, so they are read from /proc while still alive (0 elsewhere).
+    """
+    from core.tools import parallel
+
+    pool = parallel._pool
+    if pool is None:
+        return 0.0
+    # concurrent.futures keeps no public list of worker pids
+    total = sum(peak_rss_mb(pid) for pid in list(getattr(pool, '_processes', None) or {}))
+    pool.shutdown()
+    parallel._pool = None
+    return total
+
+
+def run_isolated(target, args, timeout):
+    """
+    Run target(*args, queue) in a freshly spawned process.
+
+    Args:
+        target: Function that puts one result on the queue it is given
+        args: Arguments before the queue
+        timeout: Seconds to wait before the process is killed
+
+    Returns:
+        What target put on the queue, or None if the process died (crashed,
+        was killed for memory) or timed out without producing a result
+    """
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=target, args=tuple(args) + (queue,))
+    proc.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout=1)
+        except queue_module.Empty:
+            if not proc.is_alive():
+                print(f"Benchmark process exited with code {proc.exitcode} without a result")
+                break
+            if time.monotonic() > deadline:
+                print(f"Benchmark process timed out after {timeout}s")
+                proc.kill()
+                break
+    proc.join()
+    return result
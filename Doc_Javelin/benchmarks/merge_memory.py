@@ -0,0 +1,86 @@
+"""
+Peak RSS of merge_pdfs against the number of inputs.
+
+Compares the in-memory PdfWriter path with the streaming engine. Each merge
+runs in a freshly spawned process so its peak RSS reflects that merge alone.
+
+Usage:
+    python benchmarks/merge_memory.py --counts 10 50 100 200 --pages 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fitz  # PyMuPDF
+
+from measure import peak_rss_mb, run_isolated
+
+
+def make_scanned_pdf(path, pages, size=600):
+    """Write a PDF whose pages each carry one incompressible RGB image."""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        # Random samples keep the image stream from compressing away
+        pix = fitz.Pixmap(fitz.csRGB, size, size, os.urandom(size * size * 3), 0)
+        page.insert_image(page.rect, pixmap=pix)
+    doc.save(path)
+    doc.close()
+
+
+def _measure(input_files, output_file, streaming, queue):
+    from core.tools.pdf_merger import merge_pdfs
+
+    start = time.perf_counter()
+    ok = merge_pdfs(input_files, output_file, streaming=streaming)
+    elapsed = time.perf_counter() - start
+    queue.put((ok, elapsed, peak_rss_mb()))
+
+
+def run(input_files, output_file, streaming, timeout=600):
+    """(ok, seconds, peak RSS in MB) of one merge; ok is False if it crashed or timed out."""
+    start = time.perf_counter()
+    result = run_isolated(_measure, (input_files, output_file, streaming), timeout)
+    return result or (False, time.perf_counter() - start, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 50, 100, 200])
+    parser.add_argument('--pages', type=int, default=2, help='Pages per input file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = os.path.join(tmp, 'sample.pdf')
+        make_scanned_pdf(sample, args.pages)
+        sample_mb = os.path.getsize(sample) / (1024 * 1024)
+
+        print(f"Input file: {args.pages} page(s), {sample_mb:.1f} MB each")
+        print(f"{'inputs':>7} {'total MB':>9} | {'pypdf MB':>9} {'time s':>7} | {'stream MB':>9} {'time s':>7}")
+
+        for count in args.counts:
+            # Hard links keep the corpus cheap; each reader still parses its own copy
+            inputs = []
+            for i in range(count):
+                path = os.path.join(tmp, f"in_{count}_{i}.pdf")
+                os.link(sample, path)
+                inputs.append(path)
+
+            row = [f"{count:>7} {count * sample_mb:>9.1f}"]
+            for streaming in (False, True):
+                ok, elapsed, peak_mb = run(inputs, os.path.join(tmp, 'out.pdf'), streaming)
+                row.append(f"{peak_mb:>9.1f} {elapsed:>7.2f}" if ok else f"{'failed':>9} {'':>7}")
+            print(" | ".join(row))
+
+            for path in inputs:
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+Benchmark every core.tools entry point over the synthetic corpus.
+
+Each case runs in a freshly spawned process so peak RSS belongs to that
+case alone; it includes the tools' pool workers, summed. A case that
+crashes or exceeds --timeout is recorded as failed. Results can be saved
+as a baseline and later runs compared against it.
+
+Usage:
+    python benchmarks/run.py                         # run and print
+    python benchmarks/run.py --save baseline.json    # record a baseline
+    python benchmarks/run.py --compare baseline.json # flag regressions
+    python benchmarks/run.py --only pdf_to_word compress_pdf
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CORPUS_VERSION, build_corpus
+from measure import peak_rss_mb, pool_peak_rss_mb, run_isolated
+
+DEFAULT_CORPUS_DIR = os.path.join(ROOT, 'benchmarks', '.corpus')
+# Seconds a case may run before it is killed and counted as failed
+DEFAULT_TIMEOUT = 600
+
+
+# --- Cases: each takes (files, out_dir) and returns the tool's result ---
+
+def case_merge_pdfs(files, out_dir):
+    from core.tools import merge_pdfs
+    inputs = [files['text'], files['table'], files['image'], files['many_pages']]
+    return merge_pdfs(inputs, os.path.join(out_dir, 'merged.pdf'))
+
+
+def case_img_to_pdf(files, out_dir):
+    from core.tools import img_to_pdf
+    return img_to_pdf(files['images'], os.path.join(out_dir, 'images.pdf'))
+
+
+def case_pdf_to_word(files, out_dir):
+    from core.tools import pdf_to_word
+    return pdf_to_word(files['text'], os.path.join(out_dir, 'text.docx'))
+
+
+def case_pdf_to_word_long(files, out_dir):
+    from core.tools import pdf_to_word
+    return pdf_to_word(files['many_pages'], os.path.join(out_dir, 'long.docx'))
+
+
+def case_pdf_to_excel(files, out_dir):
+    from core.tools import pdf_to_excel
+    return pdf_to_excel(files['table'], os.path.join(out_dir, 'table.xlsx'))
+
+
+# Rotate every tenth page and drop every seventy pages
+EDIT_CONFIG = [{'pageNum': n, 'rotation': 90} for n in range(1, 1001, 10)]
+EDIT_CONFIG += [{'pageNum': n, 'deleted': True} for n in range(7, 1001, 70)]
+
+
+def case_edit_pdf(files, out_dir):
+    from core.tools import edit_pdf
+    return edit_pdf(files['many_pages'], os.path.join(out_dir, 'edited.pdf'), EDIT_CONFIG)
+
+
+def case_edit_pdf_pypdf(files, out_dir):
+    from core.tools import edit_pdf
+    return edit_pdf(files['many_pages'], os.path.join(out_dir, 'edited.pdf'), EDIT_CONFIG, backend='pypdf')
+
+
+def case_edit_pdf_pymupdf(files, out_dir):
+    from core.tools import edit_pdf
+    return edit_pdf(files['many_pages'], os.path.join(out_dir, 'edited.pdf'), EDIT_CONFIG, backend='pymupdf')
+
+
+def case_compress_pdf(files, out_dir):
+    from core.tools import compress_pdf
+    return compress_pdf(files['image'], os.path.join(out_dir, 'compressed.pdf'))
+
+
+def case_flatten_pdf(files, out_dir):
+    from core.tools.pdf_flattener import flatten_pdf_with_layers
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new('RGB', (240, 80), (20, 40, 160)).save(buf, 'PNG')
+    signature = 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+    layers = []
+    for page in range(1, 41):
+        layers.append({'pageNum': page, 'type': 'text', 'text': f'Reviewed {page}',
+                       'left': 60, 'top': 40, 'fontSize': 12, 'fill': '#cc0000'})
+        layers.append({'pageNum': page, 'type': 'rect', 'left': 50, 'top': 700,
+                       'width': 200, 'height': 40, 'stroke': '#000000'})
+        layers.append({'pageNum': page, 'type': 'image', 'src': signature,
+                       'left': 380, 'top': 720, 'width': 150, 'height': 50})
+    return flatten_pdf_with_layers(files['text'], layers, os.path.join(out_dir, 'flat.pdf'))
+
+
+# name -> (function, corpus keys whose pages count as "processed")
+CASES = {
+    'merge_pdfs': (case_merge_pdfs, ['text', 'table', 'image', 'many_pages']),
+    'img_to_pdf': (case_img_to_pdf, ['images']),
+    'pdf_to_word': (case_pdf_to_word, ['text']),
+    'pdf_to_word_long': (case_pdf_to_word_long, ['many_pages']),
+    'pdf_to_excel': (case_pdf_to_excel, ['table']),
+    'edit_pdf': (case_edit_pdf, ['many_pages']),
+    'edit_pdf_pypdf': (case_edit_pdf_pypdf, ['many_pages']),
+    'edit_pdf_pymupdf': (case_edit_pdf_pymupdf, ['many_pages']),
+    'compress_pdf': (case_compress_pdf, ['image']),
+    'flatten_pdf': (case_flatten_pdf, ['text']),
+}
+
+
+def _child(name, files, out_dir, queue):
+    func, _ = CASES[name]
+    start = time.perf_counter()
+    try:
+        ok = bool(func(files, out_dir))
+    except Exception as e:
+        print(f"{name} raised: {e}")
+        ok = False
+    elapsed = time.perf_counter() - start
+    queue.put((ok, elapsed, peak_rss_mb() + pool_peak_rss_mb()))
+
+
+def run_case(name, files, out_dir, timeout=DEFAULT_TIMEOUT):
+    """Run one case in its own process: (ok, seconds, peak RSS in MB)."""
+    start = time.perf_counter()
+    result = run_isolated(_child, (name, files, out_dir), timeout)
+    if result is None:
+        print(f"{name} did not finish")
+        return False, time.perf_counter() - start, 0.0
+    return result
+
+
+def count_pages(files, keys):
+    import fitz  # PyMuPDF
+
+    total = 0
+    for key in keys:
+        if key == 'images':
+            total += len(files['images'])
+        else:
+            with fitz.open(files[key]) as doc:
+                total += doc.page_count
+    return total
+
+
+def run_all(files, names, repeat, timeout=DEFAULT_TIMEOUT):
+    results = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name in names:
+            pages = count_pages(files, CASES[name][1])
+            runs = [run_case(name, files, out_dir, timeout) for _ in range(repeat)]
+            ok = all(r[0] for r in runs)
+            seconds = min(r[1] for r in runs)
+            results[name] = {
+                'ok': ok,
+                'seconds': round(seconds, 4),
+                'pages': pages,
+                'pages_per_sec': round(pages / seconds, 2) if seconds else None,
+                'peak_rss_mb': round(max(r[2] for r in runs), 1),
+            }
+            r = results[name]
+            status = '' if ok else '  FAILED'
+            print(f"{name:<18} {r['seconds']:>9.3f} {r['pages_per_sec']:>10.1f} {r['peak_rss_mb']:>10.1f}{status}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print deltas against a baseline; return the names that regressed."""
+    regressions = []
+    print(f"\n{'case':<18} {'time':>9} {'Δtime':>8} {'rss MB':>8} {'Δrss':>8}")
+    for name, r in results.items():
+        base = baseline['results'].get(name)
+        if not base:
+            print(f"{name:<18} {'(new)':>9}")
+            continue
+        d_time = (r['seconds'] - base['seconds']) / base['seconds'] * 100 if base['seconds'] else 0.0
+        d_rss = (r['peak_rss_mb'] - base['peak_rss_mb']) / base['peak_rss_mb'] * 100 if base['peak_rss_mb'] else 0.0
+        flag = ''
+        if d_time > threshold or d_rss > threshold or (base['ok'] and not r['ok']):
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<18} {r['seconds']:>9.3f} {d_time:>+7.1f}% {r['peak_rss_mb']:>8.1f} {d_rss:>+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR, help='Corpus directory (created if missing)')
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), help='Run only these cases')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per case; the fastest is kept')
+    parser.add_argument('--save', metavar='FILE', help='Write results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='FILE', help='Compare against a saved baseline')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help='Seconds a case may run before it is killed and counted as failed')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Percent slowdown or RSS growth counted as a regression')
+    args = parser.parse_args()
+
+    print("Preparing corpus...")
+    files = build_corpus(args.corpus)
+
+    print(f"\n{'case':<18} {'seconds':>9} {'pages/s':>10} {'peak MB':>10}")
+    results = run_all(files, args.only or list(CASES), max(1, args.repeat), args.timeout)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'corpus_version': CORPUS_VERSION,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'cpus': os.cpu_count(),
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'results': results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('corpus_version') != CORPUS_VERSION:
+            print("\nWarning: baseline was recorded with a different corpus version")
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
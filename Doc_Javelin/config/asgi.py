@@ -9,8 +9,9 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
-
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
+# Django's handler, with request bodies spooled off the event loop
+from core.asgi import get_asgi_application
+
 application = get_asgi_application()
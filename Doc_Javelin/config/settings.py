@@ -52,7 +52,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.MediaSweeperMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -143,6 +145,63 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Increase max upload size for large Base64 payloads (Signatures/Images)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50 MB
 
+# Resumable (chunked) uploads: suggested chunk size and largest accepted file
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 2 * 1024 * 1024 * 1024))
+
+# Tool endpoints called with download=true return the result in the response
+# body; outputs up to this size never touch the disk
+IN_MEMORY_OUTPUT_BYTES = int(os.environ.get('IN_MEMORY_OUTPUT_BYTES', 32 * 1024 * 1024))
+
+# Downloads: '' serves files from Python; 'x-accel' (nginx) or 'x-sendfile'
+# hands them to the web server. For nginx, DOWNLOAD_ACCEL_PREFIX must be an
+# `internal` location aliased to MEDIA_ROOT.
+DOWNLOAD_OFFLOAD = os.environ.get('DOWNLOAD_OFFLOAD', '')
+DOWNLOAD_ACCEL_PREFIX = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+
+# Most files one /api/batch/<tool> request may convert
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 100))
+
+# Background jobs (tool endpoints called with mode=job). Job threads share
+# the GIL and hand heavy work to the tools' process pool, which is capped at
+# DOC_JAVELIN_WORKERS processes; one job per pool worker keeps it busy
+# without starting more work than it can run.
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or os.environ.get('DOC_JAVELIN_WORKERS') or os.cpu_count() or 2)
+JOB_QUEUE_LIMIT = int(os.environ.get('JOB_QUEUE_LIMIT', 64))
+# Every server process marks its pending and processing tasks alive every
+# JOB_HEARTBEAT_SECONDS; tasks not marked for JOB_STALE_SECONDS belonged to
+# a process that has gone, and are failed by whichever process notices first
+JOB_HEARTBEAT_SECONDS = int(os.environ.get('JOB_HEARTBEAT_SECONDS', 30))
+JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 120))
+
+# Threads that async views (core.async_views) run blocking request work on
+# under ASGI: file I/O, database access and inline tool calls
+ASYNC_VIEW_THREADS = int(os.environ.get('ASYNC_VIEW_THREADS', 32))
+
+# Bearer token required by the /metrics endpoint; empty leaves it open
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Media garbage collection (core.sweeper): entries unused for MEDIA_TTL_SECONDS
+# are deleted, then the least recently used until MEDIA_ROOT fits the budget.
+# The sweep runs every MEDIA_SWEEP_INTERVAL seconds; 0 leaves it to cron
+# (manage.py sweep_media)
+MEDIA_DISK_BUDGET_BYTES = int(os.environ.get('MEDIA_DISK_BUDGET_BYTES', 20 * 1024 ** 3))
+MEDIA_TTL_SECONDS = int(os.environ.get('MEDIA_TTL_SECONDS', 2 * 24 * 60 * 60))
+MEDIA_SWEEP_INTERVAL = int(os.environ.get('MEDIA_SWEEP_INTERVAL', 15 * 60))
+
+# Caches for data derived from documents, stored under MEDIA_ROOT/cache/<name>
+# and evicted least-recently-used first once DISK_BYTES is exceeded
+DOCUMENT_CACHES = {
+    'analysis': {
+        'MEMORY_BYTES': 32 * 1024 * 1024,
+        'DISK_BYTES': int(os.environ.get('ANALYSIS_CACHE_BYTES', 512 * 1024 * 1024)),
+    },
+    'thumbnails': {
+        'MEMORY_BYTES': 32 * 1024 * 1024,
+        'DISK_BYTES': int(os.environ.get('THUMBNAIL_CACHE_BYTES', 1024 * 1024 * 1024)),
+    },
+}
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
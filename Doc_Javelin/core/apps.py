@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.models.signals import pre_save, post_save
+        from core import jobs, metrics
+        from core.models import DocumentTask
+
+        pre_save.connect(metrics.task_pre_save, sender=DocumentTask)
+        post_save.connect(metrics.task_post_save, sender=DocumentTask)
+        request_started.connect(jobs.start_heartbeat, dispatch_uid='core.jobs.start_heartbeat')
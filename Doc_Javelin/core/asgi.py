@@ -0,0 +1,138 @@
+"""
+ASGI support: a request handler that reads bodies without blocking the
+event loop, and the thread pool async views run their blocking work on.
+"""
+
+import asyncio
+import functools
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.exceptions import RequestAborted
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
+from django.db import close_old_connections
+
+# Body data is collected in memory up to this size, then written out by a
+# thread, so a slow upload never holds the loop on a disk write
+BODY_FLUSH_BYTES = 1024 * 1024
+
+_executor = None
+_lock = threading.Lock()
+# Set once this process serves requests through ASGIHandler; see core.async_views
+serving = False
+
+
+def get_asgi_application():
+    """The project's ASGI callable; see config/asgi.py."""
+    django.setup(set_prefix=False)
+    return ASGIHandler()
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """
+    Django's ASGI handler with body spooling moved off the event loop.
+
+    Like Django's, the whole body is received before the view runs, into a
+    file that stays in memory up to FILE_UPLOAD_MAX_MEMORY_SIZE. Waiting for
+    a slow client costs no thread; only the writes of large bodies do.
+    """
+
+    def __init__(self):
+        global serving
+        serving = True
+        super().__init__()
+
+    async def read_body(self, receive):
+        body_file = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE, mode='w+b'
+        )
+        pending, pending_bytes = [], 0
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    raise RequestAborted()
+                if message.get('body'):
+                    pending.append(message['body'])
+                    pending_bytes += len(message['body'])
+                more_body = message.get('more_body', False)
+                if pending_bytes >= BODY_FLUSH_BYTES:
+                    await asyncio.to_thread(body_file.writelines, pending)
+                    pending, pending_bytes = [], 0
+                if not more_body:
+                    break
+            if pending_bytes >= settings.FILE_UPLOAD_MAX_MEMORY_SIZE or body_file.tell():
+                await asyncio.to_thread(body_file.writelines, pending)
+            else:
+                # A small body stays in memory; a thread would cost more than the copy
+                body_file.writelines(pending)
+        except BaseException:
+            body_file.close()
+            raise
+        body_file.seek(0)
+        return body_file
+
+
+def _get_executor():
+    """Create the shared request thread pool on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ASYNC_VIEW_THREADS', 16), thread_name_prefix='doc-request'
+            )
+    return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run blocking request work (file I/O, parsing, database access, tool
+    calls) on the request thread pool and wait for it without blocking
+    the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(_call, func, args, kwargs))
+
+
+async def iterate_blocking(iterator, close=None):
+    """
+    Advance a blocking iterator (e.g. a sync streaming response) on the
+    request thread pool.
+
+    If iteration stops early (the client went away), close() is called, by
+    default the iterator's own, so open files and temp files are released
+    at once rather than by GC; Django skips response.close() when the
+    request is cancelled.
+    """
+    done = object()
+    step = None
+    finished = False
+    try:
+        while True:
+            step = asyncio.ensure_future(run_blocking(next, iterator, done))
+            # Cancelling the response must not abandon a step still running in its thread
+            item = await asyncio.shield(step)
+            step = None
+            if item is done:
+                finished = True
+                return
+            yield item
+    finally:
+        close = close or getattr(iterator, 'close', None)
+        if not finished and close is not None:
+            if step is not None:
+                # A generator cannot be closed while another thread is running it
+                await asyncio.wait([step])
+            await run_blocking(close)
+
+
+def _call(func, args, kwargs):
+    # Pool threads keep their own database connections; expire them as a request would
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
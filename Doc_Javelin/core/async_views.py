@@ -0,0 +1,64 @@
+"""
+Async versions of the upload, session and tool endpoints.
+
+Under ASGI the request body is received by core.asgi.ASGIHandler without
+holding a thread, so slow uploads only cost a coroutine each. The blocking
+part of the request (multipart parsing, file I/O, database access, tool
+calls) then runs on the request thread pool, whose size (ASYNC_VIEW_THREADS)
+caps how many run at once; Django would otherwise start a thread for every
+request in flight. Streamed responses are sent as they are produced rather
+than collected first.
+
+Outside ASGI (WSGI, the test client) these names are the sync views
+themselves: Django would run an async view there through async_to_sync,
+adding an event loop and a thread hop to every request. The choice is made
+when the URLconf is first imported, which ASGIHandler precedes.
+"""
+
+import functools
+
+from django.core.handlers.asgi import ASGIRequest
+
+from core import asgi, views
+from core.asgi import iterate_blocking, run_blocking
+
+
+def threaded(view):
+    """Async version of a sync view under ASGI: the view runs on the request thread pool."""
+    if not asgi.serving:
+        return view
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        response = await run_blocking(view, request, *args, **kwargs)
+        if isinstance(request, ASGIRequest) and response.streaming and not response.is_async:
+            # Django would read a sync iterator to the end before sending any of it.
+            # streaming_content maps over the view's iterator, so the response closes it
+            response.streaming_content = iterate_blocking(response.streaming_content, response.close)
+        return response
+    return wrapper
+
+
+# Tools
+merge_pdfs_view = threaded(views.merge_pdfs_view)
+img2pdf_view = threaded(views.img2pdf_view)
+pdf2word_view = threaded(views.pdf2word_view)
+pdf2excel_view = threaded(views.pdf2excel_view)
+edit_pdf_view = threaded(views.edit_pdf_view)
+compress_pdf_view = threaded(views.compress_pdf_view)
+api_batch = threaded(views.api_batch)
+
+# Uploads
+api_upload_session = threaded(views.api_upload_session)
+api_upload_init = threaded(views.api_upload_init)
+api_upload_chunk = threaded(views.api_upload_chunk)
+api_upload_complete = threaded(views.api_upload_complete)
+
+# Editor Studio sessions
+api_process_session = threaded(views.api_process_session)
+api_editor_apply = threaded(views.api_editor_apply)
+api_pipeline = threaded(views.api_pipeline)
+api_analyze_pdf = threaded(views.api_analyze_pdf)
+api_analyze_document = threaded(views.api_analyze_document)
+api_page_thumbnail = threaded(views.api_page_thumbnail)
+api_document_thumbnails = threaded(views.api_document_thumbnails)
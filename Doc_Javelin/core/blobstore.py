@@ -0,0 +1,145 @@
+"""
+Content-addressed store for uploaded files.
+
+Uploads are hashed (SHA-256) while their chunks are written, and each
+distinct content is kept once under MEDIA_ROOT/blobs. Session and temp
+paths are hard links to the blob, so the file system link count is the
+reference count: deleting a session file drops a reference, and a blob
+whose only remaining link is its own entry can be collected.
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+import time
+import uuid
+
+from django.conf import settings
+
+# Blobs younger than this are never collected, so an upload that has just
+# stored a blob has time to link it
+GC_GRACE_SECONDS = 300
+
+
+def blob_root() -> str:
+    return os.path.join(settings.MEDIA_ROOT, 'blobs')
+
+
+def blob_path(digest: str) -> str:
+    return os.path.join(blob_root(), digest[:2], digest[2:4], digest)
+
+
+def save_chunks(chunks, dest_path: str):
+    """
+    Store an upload in the blob store and link it at dest_path.
+
+    Args:
+        chunks: Iterable of bytes (e.g. UploadedFile.chunks())
+        dest_path: Where the file should appear (session or temp path)
+
+    Returns:
+        Tuple of (sha256 hex digest, size in bytes)
+    """
+    tmp_dir = os.path.join(blob_root(), 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                h.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        digest = h.hexdigest()
+        _adopt(tmp_path, digest, dest_path)
+        return digest, size
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_file(src_path: str, dest_path: str):
+    """Move an already written file into the blob store and link it at dest_path."""
+    h = hashlib.sha256()
+    with open(src_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+    size = os.path.getsize(src_path)
+    try:
+        _adopt(src_path, digest, dest_path)
+    finally:
+        if os.path.exists(src_path) and not os.path.samefile(src_path, dest_path):
+            os.remove(src_path)
+    return digest, size
+
+
+def _adopt(tmp_path: str, digest: str, dest_path: str):
+    final = blob_path(digest)
+    # Two attempts: the collector may remove an unreferenced blob between
+    # the existence check and the link; the second pass re-creates it
+    for _ in range(2):
+        if not os.path.exists(final):
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(tmp_path, final)
+            # Blobs are shared by every link, so nothing may write to them in place
+            os.chmod(final, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        try:
+            _link(final, dest_path)
+            return
+        except FileNotFoundError:
+            continue
+    raise OSError(f"Could not link blob {digest}")
+
+
+def _link(blob: str, dest_path: str):
+    """Atomically point dest_path at blob, copying where hard links are unsupported."""
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_dest = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(blob, tmp_dest)
+    except FileNotFoundError:
+        # The blob was collected; let _adopt re-create it
+        raise
+    except OSError:
+        shutil.copyfile(blob, tmp_dest)
+    os.replace(tmp_dest, dest_path)
+
+
+def references(digest: str) -> int:
+    """Number of session/temp files currently linked to a blob."""
+    try:
+        return os.stat(blob_path(digest)).st_nlink - 1
+    except FileNotFoundError:
+        return 0
+
+
+def collect_garbage(grace_seconds: int = GC_GRACE_SECONDS):
+    """
+    Delete blobs that nothing links to any more.
+
+    Returns:
+        Tuple of (blobs removed, bytes reclaimed)
+    """
+    removed, reclaimed = 0, 0
+    cutoff = time.time() - grace_seconds
+    root = blob_root()
+    for dirpath, dirnames, filenames in os.walk(root):
+        if os.path.abspath(dirpath) == os.path.abspath(root):
+            # Leftovers in tmp/ belong to uploads that are still being written
+            dirnames[:] = [d for d in dirnames if d != 'tmp']
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+                if st.st_nlink > 1 or st.st_mtime > cutoff:
+                    continue
+                os.remove(path)
+                removed += 1
+                reclaimed += st.st_size
+            except OSError:
+                continue
+    return removed, reclaimed
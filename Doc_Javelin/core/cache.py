@@ -0,0 +1,197 @@
+"""
+Caches for data derived from uploaded documents (page analysis, renders).
+Entries are keyed by document content hash, kept in a small in-memory LRU
+and backed by a size-bounded directory under MEDIA_ROOT/cache.
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+
+_digests = OrderedDict()
+_digests_lock = threading.Lock()
+_DIGEST_MEMO_SIZE = 1024
+
+
+def file_digest(path: str) -> str:
+    """
+    SHA-256 of a file's contents.
+
+    Results are memoised on (path, size, mtime) so a file that has not
+    changed is only hashed once per process.
+    """
+    st = os.stat(path)
+    memo_key = (path, st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(memo_key)
+        if digest is not None:
+            _digests.move_to_end(memo_key)
+            return digest
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _digests_lock:
+        _digests[memo_key] = digest
+        while len(_digests) > _DIGEST_MEMO_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+class MemoryLRU:
+    """Thread-safe in-memory LRU bounded by the total size of its values."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DiskLRU:
+    """
+    Directory of cache files bounded by total size.
+
+    A hit bumps the file's mtime, which doubles as the last-access time used
+    for eviction, so recency is shared by every process using the directory.
+    When the budget is exceeded the oldest files are removed until usage
+    drops below 90% of it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def set(self, key: str, value: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._usage()
+            else:
+                self._size += len(value)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for dirpath, _, filenames in os.walk(self.directory):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def _usage(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+
+class DocumentCache:
+    """In-memory LRU in front of a DiskLRU, keyed by arbitrary strings."""
+
+    def __init__(self, directory: str, memory_bytes: int, disk_bytes: int):
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = DiskLRU(directory, disk_bytes)
+
+    @staticmethod
+    def key(key: str) -> str:
+        """Storage key for a cache key; also usable as an ETag."""
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str):
+        key = self.key(key)
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: bytes):
+        key = self.key(key)
+        self.memory.set(key, value)
+        try:
+            self.disk.set(key, value)
+        except OSError as e:
+            print(f"Error writing cache entry: {e}")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str) -> DocumentCache:
+    """Return the shared cache configured under settings.DOCUMENT_CACHES[name]."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            conf = settings.DOCUMENT_CACHES[name]
+            cache = DocumentCache(
+                os.path.join(settings.MEDIA_ROOT, 'cache', name),
+                conf['MEMORY_BYTES'],
+                conf['DISK_BYTES'],
+            )
+            _caches[name] = cache
+        return cache
@@ -0,0 +1,187 @@
+"""
+Serving of generated files: web-server offload, conditional and Range
+requests, and ZIP archives streamed as they are built.
+"""
+
+import os
+import re
+import zipfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_BLOCK_SIZE = 256 * 1024
+
+
+def serve_file(request, file_path, content_type, disposition):
+    """
+    Build the response for a file under MEDIA_ROOT.
+
+    With settings.DOWNLOAD_OFFLOAD set to 'x-accel' (nginx) or 'x-sendfile'
+    (Apache/lighttpd) only headers are returned and the web server sends the
+    bytes. Otherwise the file is streamed from Python with ETag/Last-Modified
+    validation and single-range support, so browsers can seek in PDF previews.
+    X-Sendfile carries a raw path, so files whose path is not printable ASCII
+    are streamed from Python instead.
+
+    Args:
+        request: The HttpRequest
+        file_path: Absolute path of the file to send
+        content_type: MIME type of the file
+        disposition: Value of the Content-Disposition header
+    """
+    offload = getattr(settings, 'DOWNLOAD_OFFLOAD', '')
+    if offload and offload != 'x-accel' and not (file_path.isascii() and file_path.isprintable()):
+        offload = ''
+    if offload:
+        response = HttpResponse(content_type=content_type)
+        rel_path = os.path.relpath(file_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        if offload == 'x-accel':
+            # nginx parses this as a URI; output names come from upload names
+            response['X-Accel-Redirect'] = settings.DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/' + quote(rel_path)
+        else:
+            response['X-Sendfile'] = file_path
+        response['Content-Disposition'] = disposition
+        return response
+
+    st = os.stat(file_path)
+    size = st.st_size
+    etag = quote_etag(f"{st.st_mtime_ns:x}-{size:x}")
+    last_modified = int(st.st_mtime)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    byte_range = _requested_range(request, size, etag, last_modified)
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(file_path, start, end - start + 1),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = disposition
+    return response
+
+
+def _requested_range(request, size, etag, last_modified):
+    """
+    Parse a single-range Range header.
+
+    Returns (start, end) inclusive, 'unsatisfiable', or None to send the
+    whole file (no header, an invalid or multiple ranges, or a stale If-Range).
+    """
+    header = request.META.get('HTTP_RANGE', '').strip()
+    if not header or request.method not in ('GET', 'HEAD'):
+        return None
+
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range:
+        if if_range.startswith(('"', 'W/')):
+            if if_range != etag:
+                return None
+        elif parse_http_date_safe(if_range) != last_modified:
+            return None
+
+    match = RANGE_RE.match(header)
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return 'unsatisfiable'
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # Not a valid range; RFC 9110 says to ignore the header
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def _read_range(file_path, start, length):
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            data = f.read(min(STREAM_BLOCK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def iter_zip(entries):
+    """
+    Build a ZIP archive on the fly, yielding its bytes as they are written.
+
+    Entries are taken from `entries` only when the previous one has been
+    sent, so they can still be in the making while the archive streams.
+    Nothing is seeked back over: sizes and checksums follow each entry in
+    a data descriptor.
+
+    Args:
+        entries: Iterable of (name in the archive, file path or bytes)
+    """
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for arcname, source in entries:
+            if isinstance(source, (bytes, bytearray)):
+                archive.writestr(arcname, source)
+            else:
+                info = zipfile.ZipInfo.from_file(source, arcname)
+                with open(source, 'rb') as src, archive.open(info, 'w') as dest:
+                    while True:
+                        data = src.read(STREAM_BLOCK_SIZE)
+                        if not data:
+                            break
+                        dest.write(data)
+                        if buffer.size >= STREAM_BLOCK_SIZE:
+                            yield buffer.drain()
+            if buffer.size:
+                yield buffer.drain()
+    if buffer.size:
+        yield buffer.drain()
+
+
+class _ZipBuffer:
+    """Unseekable write target for ZipFile that hands written bytes on."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
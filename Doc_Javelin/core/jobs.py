@@ -0,0 +1,260 @@
+"""
+Background job runner for the tool endpoints.
+Runs tool calls in a bounded worker pool and tracks them on DocumentTask rows.
+
+The queue lives in the server process. Each process refreshes heartbeat_at
+on the tasks it holds, and tasks whose heartbeat has stopped (their process
+was restarted or killed) are failed by any other process, so several
+processes can share the database without failing each other's jobs.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from core import metrics, sweeper
+from core.models import DocumentTask
+from core.tools.reporting import tracking_progress
+
+# Progress is written to the task at most this often
+PROGRESS_WRITE_SECONDS = 1.0
+
+_executor = None
+_slots = None
+# Ids of tasks queued in this process and not yet started, oldest first
+_queued = []
+# Files each queued or running job reads or writes, by task id
+_job_paths = {}
+_heartbeat = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    """Create the shared worker pool on first use."""
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = getattr(settings, 'JOB_WORKERS', 4)
+            queue_limit = getattr(settings, 'JOB_QUEUE_LIMIT', 64)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='doc-job')
+            # Running + queued jobs are capped so a burst cannot grow the backlog without bound
+            _slots = threading.BoundedSemaphore(workers + queue_limit)
+    return _executor
+
+
+def submit_job(task_id, func, args=(), kwargs=None, output_file=None, cleanup=()):
+    """
+    Queue a tool call for a pending DocumentTask.
+
+    Args:
+        task_id: Primary key of the DocumentTask tracking this job
+        func: Tool function; a truthy return value means success
+        args: Positional arguments for func
+        kwargs: Keyword arguments for func
+        output_file: Media-relative path stored on the task when func succeeds
+        cleanup: Paths removed once the job has finished (temp uploads)
+
+    Returns:
+        True if the job was queued, False if the pool is full
+    """
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        return False
+    paths = _paths_in(args, cleanup)
+    with _lock:
+        _queued.append(task_id)
+        _job_paths[task_id] = paths
+    _touch(paths)
+    try:
+        executor.submit(_run_job, task_id, func, args, kwargs or {}, output_file, cleanup)
+    except Exception:
+        with _lock:
+            _queued.remove(task_id)
+            _job_paths.pop(task_id, None)
+        _slots.release()
+        raise
+    return True
+
+
+def _run_job(task_id, func, args, kwargs, output_file, cleanup):
+    with _lock:
+        _queued.remove(task_id)
+    close_old_connections()
+    try:
+        with metrics.phase('task_write'):
+            started = DocumentTask.objects.filter(pk=task_id, status='pending').update(
+                status='processing', heartbeat_at=timezone.now()
+            )
+        if not started:
+            return  # Failed as stale while it waited
+        progress = _Progress(task_id)
+        try:
+            with tracking_progress(progress):
+                success = func(*args, **kwargs)
+            error = None if success else 'Processing failed'
+        except Exception as e:
+            success = False
+            error = str(e)
+
+        # Only a task still processing is finished; one failed as stale stays failed
+        running = DocumentTask.objects.filter(pk=task_id, status='processing')
+        with metrics.phase('task_write'):
+            if success:
+                running.update(
+                    status='success',
+                    output_file=output_file,
+                    output_token=DocumentTask.token_for(output_file),
+                    pages_done=progress.total,
+                    pages_total=progress.total,
+                    finished_at=timezone.now()
+                )
+            else:
+                running.update(
+                    status='failed',
+                    error_message=error,
+                    finished_at=timezone.now()
+                )
+    except Exception as e:
+        print(f"Error running job {task_id}: {e}")
+    finally:
+        for p in cleanup:
+            try: os.remove(p)
+            except: pass
+        with _lock:
+            _job_paths.pop(task_id, None)
+        _slots.release()
+        close_old_connections()
+
+
+def queue_position(task):
+    """Number of jobs queued in this process ahead of this one."""
+    with _lock:
+        try:
+            return _queued.index(task.pk)
+        except ValueError:
+            return 0
+
+
+def active_paths():
+    """Absolute paths of the files used by jobs queued or running in this process."""
+    with _lock:
+        return {p for paths in _job_paths.values() for p in paths}
+
+
+def _paths_in(args, cleanup):
+    """File paths among a job's arguments (strings, or lists of them) and cleanup list."""
+    paths = set()
+    for arg in list(args) + [list(cleanup)]:
+        for value in (arg if isinstance(arg, (list, tuple)) else [arg]):
+            if isinstance(value, str):
+                paths.add(os.path.abspath(value))
+    return paths
+
+
+class _Progress:
+    """Writes a running job's page progress (and heartbeat) to its task, throttled."""
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.done = 0
+        self.total = 0
+        self.written_at = 0.0
+
+    def __call__(self, done, total):
+        self.done += done
+        self.total += total
+        now = time.monotonic()
+        if now - self.written_at < PROGRESS_WRITE_SECONDS:
+            return
+        self.written_at = now
+        try:
+            with metrics.phase('task_write'):
+                DocumentTask.objects.filter(pk=self.task_id, status='processing').update(
+                    pages_done=min(self.done, self.total),
+                    pages_total=self.total,
+                    heartbeat_at=timezone.now()
+                )
+        except Exception as e:
+            print(f"Error saving progress of job {self.task_id}: {e}")
+
+
+def start_heartbeat(**kwargs):
+    """
+    Start this process's heartbeat thread; safe to call repeatedly.
+
+    Connected to request_started, so every server process runs one from its
+    first request, and management commands never do.
+    """
+    global _heartbeat
+    interval = getattr(settings, 'JOB_HEARTBEAT_SECONDS', 30)
+    if not interval:
+        return
+    with _lock:
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(target=_heartbeat_loop, args=(interval,), name='job-heartbeat', daemon=True)
+            _heartbeat.start()
+
+
+def _heartbeat_loop(interval):
+    while True:
+        try:
+            with _lock:
+                task_ids = list(_job_paths)
+            _touch(active_paths())
+            if task_ids:
+                DocumentTask.objects.filter(pk__in=task_ids, status__in=('pending', 'processing')).update(
+                    heartbeat_at=timezone.now()
+                )
+            recover_interrupted_jobs()
+        except Exception as e:
+            print(f"Error in job heartbeat: {e}")
+        finally:
+            close_old_connections()
+        time.sleep(interval)
+
+
+def _touch(paths):
+    """
+    Mark a job's files, and the directories holding them, as just used.
+
+    The sweeper of every process then sees them as recently used; temp
+    inputs are blob links and would otherwise keep the blob's old times.
+    """
+    for path in paths | {os.path.dirname(p) for p in paths}:
+        if os.path.exists(path):
+            sweeper.touch(path)
+
+
+def recover_interrupted_jobs(stale_seconds=None) -> int:
+    """
+    Fail pending and processing tasks whose process has stopped heartbeating.
+
+    Their jobs were queued in a server process that was restarted or killed
+    and will never run. Tasks held by live processes, in this server or any
+    other sharing the database, are left alone.
+
+    Args:
+        stale_seconds: Heartbeat age after which a task is given up on
+                       (default: settings.JOB_STALE_SECONDS)
+
+    Returns:
+        Number of tasks failed
+    """
+    if stale_seconds is None:
+        stale_seconds = getattr(settings, 'JOB_STALE_SECONDS', 120)
+    cutoff = timezone.now() - timedelta(seconds=stale_seconds)
+    return DocumentTask.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at=None, created_at__lt=cutoff),
+        status__in=('pending', 'processing'),
+    ).update(
+        status='failed',
+        error_message='Interrupted by a server restart',
+        finished_at=timezone.now()
+    )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core import blobstore
+
+
+class Command(BaseCommand):
+    help = "Delete uploaded blobs that no session or temp file links to any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=blobstore.GC_GRACE_SECONDS,
+                            help='Keep blobs modified within this many seconds')
+
+    def handle(self, *args, **options):
+        removed, reclaimed = blobstore.collect_garbage(options['grace'])
+        self.stdout.write(f"Removed {removed} blob(s), reclaimed {reclaimed} bytes")
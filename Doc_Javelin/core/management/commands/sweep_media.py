@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import sweeper
+
+
+class Command(BaseCommand):
+    help = "Delete expired sessions, temp files, outputs and tasks, then evict until under the disk budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=int, default=settings.MEDIA_DISK_BUDGET_BYTES,
+                            help='Total bytes allowed under MEDIA_ROOT (0 disables eviction for space)')
+        parser.add_argument('--ttl', type=int, default=settings.MEDIA_TTL_SECONDS,
+                            help='Remove entries unused for this many seconds (0 disables expiry)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be removed without removing anything')
+
+    def handle(self, *args, **options):
+        report = sweeper.sweep(options['budget'], options['ttl'], options['dry_run'])
+        prefix = "Would have " if options['dry_run'] else ""
+        self.stdout.write(f"{prefix}{sweeper.format_report(report)}")
@@ -0,0 +1,228 @@
+"""
+In-process performance metrics for the tool endpoints.
+
+Tool calls and request phases (upload, file save, DocumentTask writes) are
+recorded into histograms and rendered in the Prometheus text format by the
+/metrics view. Each worker process keeps its own registry; scrape every
+worker, or run a single process, to see the whole picture.
+"""
+
+import functools
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTE_BUCKETS = tuple(16 * 1024 * 4 ** i for i in range(9))  # 16 KB .. 1 GB
+PAGE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+PREFIX = 'doc_javelin'
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for labels, (counts, total, count) in items:
+            pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels)]
+            for bound, c in zip(self.buckets, counts):
+                le = ','.join(pairs + [f'le="{_format(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {c}")
+            inf = ','.join(pairs + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{inf}}} {count}")
+            base = '{' + ','.join(pairs) + '}' if pairs else ''
+            lines.append(f"{self.name}_sum{base} {_format(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+TOOL_DURATION = Histogram(f'{PREFIX}_tool_duration_seconds', 'Wall time of core.tools calls.',
+                          ('tool', 'outcome'), DURATION_BUCKETS)
+TOOL_INPUT_BYTES = Histogram(f'{PREFIX}_tool_input_bytes', 'Total size of the input files of a tool call.',
+                             ('tool',), BYTE_BUCKETS)
+TOOL_OUTPUT_BYTES = Histogram(f'{PREFIX}_tool_output_bytes', 'Size of the file(s) a successful tool call wrote.',
+                              ('tool',), BYTE_BUCKETS)
+TOOL_PAGES = Histogram(f'{PREFIX}_tool_pages', 'Input pages (or images) handled by a tool call.',
+                       ('tool',), PAGE_BUCKETS)
+TOOL_PEAK_MEMORY = Histogram(f'{PREFIX}_tool_peak_memory_bytes',
+                             'Resident memory growth during a tool call (approximate when calls overlap).',
+                             ('tool',), BYTE_BUCKETS)
+PHASE_DURATION = Histogram(f'{PREFIX}_phase_duration_seconds',
+                           'Wall time of request phases: upload, file_save, task_write.',
+                           ('phase',), DURATION_BUCKETS)
+REQUEST_DURATION = Histogram(f'{PREFIX}_request_duration_seconds', 'Wall time of HTTP requests by view.',
+                             ('view', 'status'), DURATION_BUCKETS)
+
+REGISTRY = (TOOL_DURATION, TOOL_INPUT_BYTES, TOOL_OUTPUT_BYTES, TOOL_PAGES, TOOL_PEAK_MEMORY,
+            PHASE_DURATION, REQUEST_DURATION)
+
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def render():
+    """Return every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def phase(name):
+    """Time a block of request handling as the named phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_DURATION.observe(time.perf_counter() - start, name)
+
+
+def instrument(tool, func, input_arg=0, output_arg=1):
+    """
+    Wrap a tool function so each call is recorded.
+
+    Args:
+        tool: Label used for the tool in the metrics
+        func: Tool function; a result of None or False counts as a failure
+        input_arg: Position of the input (a path, bytes, file object or a list of them)
+        output_arg: Position of the output path, or None if the tool writes no file;
+                    output written to a stream is not measured
+
+    Returns:
+        The wrapped function
+    """
+    # Imported here: core.tools pulls in every tool's dependencies
+    from core.tools.reporting import counting_pages
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        global _in_flight
+        inputs = args[input_arg] if len(args) > input_arg else []
+        TOOL_INPUT_BYTES.observe(_size(inputs), tool)
+
+        with _in_flight_lock:
+            # Peak RSS can only be reset while nothing else is measuring it
+            if _in_flight == 0:
+                _reset_peak_rss()
+            _in_flight += 1
+        rss_before, _ = _memory()
+        start = time.perf_counter()
+        outcome = 'failure'
+        # Tools report the pages they read, so inputs are not opened twice
+        pages = []
+        try:
+            with counting_pages() as pages:
+                result = func(*args, **kwargs)
+            if result is not None and result is not False:
+                outcome = 'success'
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            _, peak_after = _memory()
+            with _in_flight_lock:
+                _in_flight -= 1
+            TOOL_DURATION.observe(elapsed, tool, outcome)
+            TOOL_PEAK_MEMORY.observe(max(peak_after - rss_before, 0), tool)
+            if pages:
+                TOOL_PAGES.observe(sum(pages), tool)
+            if outcome == 'success' and output_arg is not None and len(args) > output_arg \
+                    and _paths(args[output_arg]):
+                TOOL_OUTPUT_BYTES.observe(_size(args[output_arg]), tool)
+    return wrapper
+
+
+def _paths(value):
+    if isinstance(value, (str, os.PathLike)):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if isinstance(v, (str, os.PathLike))]
+    return []
+
+
+def _size(value):
+    """Total size of paths, bytes and sized file objects (e.g. uploads)."""
+    total = 0
+    for item in value if isinstance(value, (list, tuple)) else [value]:
+        if isinstance(item, (str, os.PathLike)):
+            try:
+                total += os.path.getsize(item)
+            except OSError:
+                pass
+        elif isinstance(item, (bytes, bytearray, memoryview)):
+            total += memoryview(item).nbytes
+        elif isinstance(getattr(item, 'size', None), int):
+            total += item.size
+    return total
+
+
+def _memory():
+    """Current and peak resident set size of this process, in bytes."""
+    try:
+        rss = peak = 0
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith('VmHWM:'):
+                    peak = int(line.split()[1]) * 1024
+        return rss, peak
+    except OSError:
+        # No procfs: ru_maxrss is KB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if peak > 1 << 32 else peak * 1024
+        return peak, peak
+
+
+def _reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+# --- DocumentTask writes, timed through model signals ---
+
+def task_pre_save(sender, instance, **kwargs):
+    instance._metrics_save_started = time.perf_counter()
+
+
+def task_post_save(sender, instance, **kwargs):
+    start = getattr(instance, '_metrics_save_started', None)
+    if start is not None:
+        PHASE_DURATION.observe(time.perf_counter() - start, 'task_write')
+        instance._metrics_save_started = None
@@ -0,0 +1,116 @@
+"""
+Request-level instrumentation feeding core.metrics, and the hook that
+starts the media sweeper in server processes.
+
+All middleware here works in both sync (WSGI) and async (ASGI) mode. Each
+sync-only middleware in MIDDLEWARE would make Django switch the rest of the
+chain to a thread and back for every request.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from core import metrics, sweeper
+from core.asgi import iterate_blocking, run_blocking
+
+
+class MetricsMiddleware:
+    """
+    Record request latency per view, and time multipart body parsing as the
+    'upload' phase. Must come before CsrfViewMiddleware, which would
+    otherwise parse the body first.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        if self._is_upload(request):
+            # Parse off the event loop; process_view then finds it done
+            await run_blocking(self._parse_upload, request)
+        response = await self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self._is_upload(request):
+            self._parse_upload(request)
+        return None
+
+    @staticmethod
+    def _is_upload(request):
+        return (request.method == 'POST' and request.content_type == 'multipart/form-data'
+                and not hasattr(request, '_files'))
+
+    @staticmethod
+    def _parse_upload(request):
+        with metrics.phase('upload'):
+            request.FILES
+
+    @staticmethod
+    def _observe(request, response, start):
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unmatched'
+        metrics.REQUEST_DURATION.observe(time.perf_counter() - start, view, str(response.status_code))
+
+
+class MediaSweeperMiddleware:
+    """
+    Start the background media sweeper (core.sweeper) in each server process.
+    Middleware is only built by the request handler, so management commands
+    and migrations never start it.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        sweeper.start()
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise, able to run in async mode so it does not force the chain into sync."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await run_blocking(self.find_file, request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            response = await run_blocking(self.serve, static_file, request)
+            if response.streaming and not response.is_async:
+                response.streaming_content = iterate_blocking(response.streaming_content)
+            return response
+        return await self.get_response(request)
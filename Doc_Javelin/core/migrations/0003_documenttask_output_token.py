@@ -0,0 +1,35 @@
+import re
+
+from django.db import migrations, models
+
+OUTPUT_TOKEN_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+def fill_output_tokens(apps, schema_editor):
+    DocumentTask = apps.get_model('core', 'DocumentTask')
+    batch = []
+    for task in DocumentTask.objects.exclude(output_file='').exclude(output_file=None).iterator():
+        matches = OUTPUT_TOKEN_RE.findall(task.output_file.name)
+        task.output_token = matches[-1] if matches else ''
+        batch.append(task)
+        if len(batch) >= 1000:
+            DocumentTask.objects.bulk_update(batch, ['output_token'])
+            batch = []
+    if batch:
+        DocumentTask.objects.bulk_update(batch, ['output_token'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_documenttask_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documenttask',
+            name='output_token',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=36),
+        ),
+        migrations.RunPython(fill_output_tokens, migrations.RunPython.noop),
+    ]
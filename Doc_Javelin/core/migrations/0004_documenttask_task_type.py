@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_documenttask_output_token'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documenttask',
+            name='task_type',
+            field=models.CharField(choices=[('merge', 'Merge PDFs'), ('img2pdf', 'Image to PDF'), ('pdf2word', 'PDF to Word'), ('pdf2excel', 'PDF to Excel'), ('edit_pdf', 'Edit PDF'), ('compress', 'Compress PDF'), ('pipeline', 'PDF Pipeline')], max_length=20),
+        ),
+    ]
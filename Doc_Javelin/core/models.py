@@ -1,5 +1,11 @@
 from django.db import models
 import os
+import re
+
+# Generated output names embed a uuid4; it is indexed so downloads can find the task
+OUTPUT_TOKEN_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+# The start of that uuid, in a name cut off part-way through it
+OUTPUT_TOKEN_PREFIX_RE = re.compile(r'[0-9a-f]{8}[-0-9a-f]{0,27}$')
 
 class DocumentTask(models.Model):
     TASK_CHOICES = [
@@ -7,6 +13,9 @@ class DocumentTask(models.Model):
         ('img2pdf', 'Image to PDF'),
         ('pdf2word', 'PDF to Word'),
         ('pdf2excel', 'PDF to Excel'),
+        ('edit_pdf', 'Edit PDF'),
+        ('compress', 'Compress PDF'),
+        ('pipeline', 'PDF Pipeline'),
     ]
 
     STATUS_CHOICES = [
@@ -21,8 +30,15 @@ class DocumentTask(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     finished_at = models.DateTimeField(null=True, blank=True)
     
+    # Job progress, as reported by the tool (core.tools.reporting)
+    pages_done = models.PositiveIntegerField(default=0)
+    pages_total = models.PositiveIntegerField(default=0)
+    # Refreshed by the process running a pending or processing job; see core.jobs
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    
     # Store output file
     output_file = models.FileField(upload_to='outputs/', null=True, blank=True)
+    output_token = models.CharField(max_length=36, blank=True, default='', db_index=True)
     
     # Optional: store original filename(s) for reference
     original_filenames = models.TextField(help_text="Comma-separated list of original filenames")
@@ -36,6 +52,22 @@ class DocumentTask(models.Model):
     class Meta:
         ordering = ['-created_at']
 
+    @staticmethod
+    def token_for(name):
+        """Return the uuid embedded in an output filename, or '' if there is none."""
+        matches = OUTPUT_TOKEN_RE.findall(name or '')
+        return matches[-1] if matches else ''
+
+    @staticmethod
+    def token_prefix_for(name):
+        """Return the start of an output uuid that a truncated name ends with, or ''."""
+        match = OUTPUT_TOKEN_PREFIX_RE.search(os.path.splitext(name or '')[0])
+        return match.group(0) if match else ''
+
+    def save(self, *args, **kwargs):
+        self.output_token = self.token_for(self.output_file.name if self.output_file else '')
+        super().save(*args, **kwargs)
+
     def delete(self, *args, **kwargs):
         # Delete file from system when model is deleted
         if self.output_file:
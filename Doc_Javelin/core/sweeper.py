@@ -0,0 +1,261 @@
+"""
+Disk-budget garbage collection for MEDIA_ROOT.
+
+Session directories, temp uploads and generated outputs are removed once
+they have not been used for MEDIA_TTL_SECONDS, together with the
+DocumentTask rows that point at them. If what remains still exceeds
+MEDIA_DISK_BUDGET_BYTES, the least recently used entries are evicted until
+usage drops below 90% of the budget. Blobs left without links are then
+collected by the blob store.
+
+Last use is recorded with touch(): a session's directory mtime is bumped
+when the session is opened or a chunk is uploaded to it, and an output's
+atime when it is downloaded (its mtime feeds ETags, so it is left alone).
+Jobs touch their files when queued and on every heartbeat (see core.jobs),
+so the sweeper of any process sees them in use as long as
+JOB_HEARTBEAT_SECONDS is well below MEDIA_TTL_SECONDS and MIN_IDLE_SECONDS.
+The files of jobs in this process are also skipped outright.
+"""
+
+import os
+import shutil
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core import blobstore
+
+# Entries used more recently than this are never evicted for space, so
+# sessions being worked on are not pulled out from under their users
+MIN_IDLE_SECONDS = 60 * 60
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def touch(path: str):
+    """Record that a session directory or output file was just used."""
+    try:
+        if os.path.isdir(path):
+            os.utime(path)
+        else:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+    except OSError:
+        pass
+
+
+def sweep(budget_bytes=None, ttl_seconds=None, dry_run=False) -> dict:
+    """
+    Delete expired media, then evict by last use until under budget.
+
+    Args:
+        budget_bytes: Total size allowed for sessions, temp, outputs, blobs
+                      and caches (default: settings.MEDIA_DISK_BUDGET_BYTES;
+                      0 disables eviction for space)
+        ttl_seconds: Idle time after which entries and finished tasks expire
+                     (default: settings.MEDIA_TTL_SECONDS)
+        dry_run: Report what would be removed without removing anything
+
+    Returns:
+        dict with counts of removed 'sessions', 'temp', 'outputs', 'tasks'
+        and 'blobs', the bytes 'reclaimed', and 'usage' before and after
+    """
+    from core.jobs import active_paths
+    from core.models import DocumentTask
+
+    if budget_bytes is None:
+        budget_bytes = getattr(settings, 'MEDIA_DISK_BUDGET_BYTES', 0)
+    if ttl_seconds is None:
+        ttl_seconds = getattr(settings, 'MEDIA_TTL_SECONDS', 0)
+
+    report = {'sessions': 0, 'temp': 0, 'outputs': 0, 'tasks': 0, 'blobs': 0}
+    report['usage_before'] = usage = _usage()
+    if not dry_run:
+        # Blobs orphaned since the last sweep should not count against the budget
+        report['blobs'], reclaimed = blobstore.collect_garbage()
+        usage -= reclaimed
+
+    now = time.time()
+    entries = sorted(_entries())
+    # A job's inputs and output, and the session directories holding them
+    in_use = active_paths()
+    in_use |= {os.path.dirname(path) for path in in_use}
+    task_files = {}
+    for task_id, name in DocumentTask.objects.exclude(output_file='').exclude(output_file=None).values_list('id', 'output_file'):
+        task_files.setdefault(os.path.join(settings.MEDIA_ROOT, name), []).append(task_id)
+
+    # Expired entries first, then the least recently used until under budget
+    doomed = []
+    target = budget_bytes * 0.9
+    for last_used, kind, path, freed in entries:
+        if path in in_use:
+            continue
+        idle = now - last_used
+        expired = ttl_seconds and idle > ttl_seconds
+        # Entries whose data is shared with others free nothing, so they cannot help
+        over_budget = budget_bytes and freed and usage > target and idle > MIN_IDLE_SECONDS
+        if expired or over_budget:
+            doomed.append((kind, path))
+            usage -= freed
+
+    removed = set()
+    for kind, path in doomed:
+        if dry_run or _remove(path):
+            report[kind] += 1
+            removed.add(path)
+
+    # A task expires with its output; tasks without one expire by age
+    expired_tasks = {task_id for path in removed for task_id in task_files.get(path, ())}
+    if ttl_seconds:
+        cutoff = timezone.now() - timedelta(seconds=ttl_seconds)
+        old = DocumentTask.objects.filter(created_at__lt=cutoff, status__in=('success', 'failed'))
+        for task_id, name in old.values_list('id', 'output_file'):
+            if not name or not os.path.exists(os.path.join(settings.MEDIA_ROOT, name)):
+                expired_tasks.add(task_id)
+    report['tasks'] = len(expired_tasks)
+    if not dry_run:
+        # QuerySet.delete() skips DocumentTask.delete(); the files are already gone
+        ids = list(expired_tasks)
+        for i in range(0, len(ids), 500):
+            DocumentTask.objects.filter(pk__in=ids[i:i + 500]).delete()
+
+        report['blobs'] += blobstore.collect_garbage()[0]
+        usage = _usage()
+    report['usage_after'] = usage
+    report['reclaimed'] = max(report['usage_before'] - usage, 0)
+    return report
+
+
+def _entries():
+    """
+    Yield (last use, kind, path, bytes freed by removing it) for every
+    session directory, temp file and output.
+
+    A file hard-linked to a blob only frees space when it is the blob's last
+    link, so shared content counts as nothing.
+    """
+    for kind in ('sessions', 'temp', 'outputs'):
+        root = os.path.join(settings.MEDIA_ROOT, kind)
+        try:
+            names = os.listdir(root)
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isdir(path):
+                if kind != 'sessions':
+                    continue
+                last_used = st.st_mtime
+                freed = sum(_freed(os.path.join(path, f)) for f in os.listdir(path))
+            else:
+                last_used = max(st.st_atime, st.st_mtime)
+                freed = _freed(path)
+            yield last_used, kind, path, freed
+
+
+def _freed(path: str) -> int:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0
+    # One link from the blob store plus this one
+    return st.st_size if st.st_nlink <= 2 else 0
+
+
+def _usage() -> int:
+    """Bytes used under MEDIA_ROOT by the swept directories, blobs and caches."""
+    seen = set()
+    total = 0
+    for kind in ('sessions', 'temp', 'outputs', 'blobs', 'cache'):
+        for dirpath, _, filenames in os.walk(os.path.join(settings.MEDIA_ROOT, kind)):
+            for name in filenames:
+                try:
+                    st = os.stat(os.path.join(dirpath, name))
+                except OSError:
+                    continue
+                # Hard links share one copy of the data
+                if (st.st_dev, st.st_ino) not in seen:
+                    seen.add((st.st_dev, st.st_ino))
+                    total += st.st_size
+    return total
+
+
+def _remove(path: str) -> bool:
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+        return True
+    except OSError as e:
+        print(f"Error removing {path}: {e}")
+        return False
+
+
+def start(interval=None):
+    """
+    Run sweep() every `interval` seconds in a daemon thread of this process.
+
+    Safe to call repeatedly. When several processes run a sweeper, a lock
+    file lets only one of them sweep at a time.
+    """
+    global _thread
+    if interval is None:
+        interval = getattr(settings, 'MEDIA_SWEEP_INTERVAL', 0)
+    if not interval:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, args=(interval,), name='media-sweeper', daemon=True)
+            _thread.start()
+
+
+def _loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            with _sweep_lock() as acquired:
+                if acquired:
+                    report = sweep()
+                    if report['reclaimed'] or report['tasks']:
+                        print(f"Media sweep: {format_report(report)}")
+        except Exception as e:
+            print(f"Error sweeping media: {e}")
+        finally:
+            close_old_connections()
+
+
+class _sweep_lock:
+    """Non-blocking exclusive lock on MEDIA_ROOT/.sweep.lock; always acquired without fcntl."""
+
+    def __enter__(self):
+        self.file = None
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+        self.file = open(os.path.join(settings.MEDIA_ROOT, '.sweep.lock'), 'w')
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def __exit__(self, *exc):
+        if self.file is not None:
+            self.file.close()
+
+
+def format_report(report: dict) -> str:
+    return (f"removed {report['sessions']} session(s), {report['temp']} temp file(s), "
+            f"{report['outputs']} output(s), {report['tasks']} task(s), {report['blobs']} blob(s); "
+            f"reclaimed {report['reclaimed']} bytes, usage {report['usage_before']} -> {report['usage_after']}")
@@ -3,16 +3,24 @@ Document conversion and manipulation tools.
 """
 
 from .pdf_merger import merge_pdfs
-from .img_to_pdf import img_to_pdf
+from .img_to_pdf import img_to_pdf, img_to_pdfs
 from .pdf_to_word import pdf_to_word
 from .pdf_to_excel import pdf_to_excel
 from .pdf_editor import edit_pdf
+from .compress_pdf import compress_pdf, compress_pdf_report
+from .pipeline import run_pipeline
+from .batch import iter_batch
 
 __all__ = [
     'merge_pdfs',
     'img_to_pdf',
+    'img_to_pdfs',
     'pdf_to_word',
     'pdf_to_excel',
     'edit_pdf',
+    'compress_pdf',
+    'compress_pdf_report',
+    'run_pipeline',
+    'iter_batch',
 ]
 
@@ -0,0 +1,88 @@
+"""
+Batch Conversion - Run one tool over many documents across worker processes.
+"""
+
+from typing import Iterator, List, Optional, Tuple
+
+from .compress_pdf import compress_pdf_report
+from .parallel import completed_map, default_workers, process_pool
+from .pdf_editor import edit_pdf
+from .pdf_to_excel import OUTPUT_FORMATS, pdf_to_excel
+from .pdf_to_word import pdf_to_word
+from .streams import Source, portable
+
+# Tools a batch can run
+BATCH_TOOLS = ('pdf2word', 'pdf2excel', 'compress', 'edit_pdf')
+
+
+def batch_extension(tool: str, options: Optional[dict] = None) -> str:
+    """Extension of the files `tool` produces with these options."""
+    if tool == 'pdf2word':
+        return 'docx'
+    if tool == 'pdf2excel':
+        return (options or {}).get('format') or 'xlsx'
+    return 'pdf'
+
+
+def iter_batch(tool: str, inputs: List[Source], output_files: List[str],
+               options: Optional[dict] = None,
+               workers: Optional[int] = None) -> Iterator[Tuple[int, bool]]:
+    """
+    Convert every input with the same tool, one document per worker process.
+
+    Results are yielded as conversions finish, not in input order, so a
+    caller can pass each output on while the rest are still running.
+
+    Options by tool:
+        pdf2word:  none
+        pdf2excel: 'format' ('xlsx', 'csv' or 'parquet')
+        compress:  'level' (see COMPRESSION_LEVELS)
+        edit_pdf:  'pages_config' and 'compact', as edit_pdf; applied to every file
+
+    Args:
+        tool: One of BATCH_TOOLS
+        inputs: PDFs as paths, bytes or binary file objects
+        output_files: Output path for each input, in the same order
+        options: Tool options, shared by every input
+        workers: Most conversions in flight at once (default: the worker budget)
+
+    Yields:
+        (index into inputs, whether that conversion succeeded)
+    """
+    if tool not in BATCH_TOOLS:
+        raise ValueError(f"Unknown batch tool: {tool}")
+    if tool == 'pdf2excel' and batch_extension(tool, options) not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {batch_extension(tool, options)}")
+    options = options or {}
+    workers = workers or default_workers()
+
+    if workers <= 1 or len(inputs) < 2:
+        for index, (source, output_file) in enumerate(zip(inputs, output_files)):
+            yield index, _convert(tool, source, output_file, options)
+        return
+
+    # Conversions not yet started are dropped if the consumer stops early (e.g. the client went away)
+    yield from completed_map(process_pool(), _convert_indexed, (
+        (index, tool, portable(source), output_file, options)
+        for index, (source, output_file) in enumerate(zip(inputs, output_files))
+    ), workers)
+
+
+def _convert_indexed(index: int, tool: str, source: Source, output_file: str,
+                     options: dict) -> Tuple[int, bool]:
+    return index, _convert(tool, source, output_file, options)
+
+
+def _convert(tool: str, source: Source, output_file: str, options: dict) -> bool:
+    """Run one conversion; the batch already uses every core, so the tool runs single-process."""
+    try:
+        if tool == 'pdf2word':
+            return pdf_to_word(source, output_file, workers=1)
+        if tool == 'pdf2excel':
+            return pdf_to_excel(source, output_file, output_format=batch_extension(tool, options))
+        if tool == 'compress':
+            return compress_pdf_report(source, output_file, int(options.get('level', 1)), workers=1) is not None
+        return edit_pdf(source, output_file, options.get('pages_config') or [], options.get('compact'))
+    except Exception as e:
+        print(f"Error in batch {tool}: {e}")
+        return False
@@ -2,87 +2,244 @@
 Image to PDF Converter - Convert one or more images to PDF.
 """
 
+import io
 import os
 from typing import List, Optional
 from PIL import Image
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    FloatObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
 
+from .parallel import default_workers, ordered_map, process_pool
+from .reporting import report_pages, report_pages_done
+from .streams import (
+    Destination, Source, StreamingPdfWriter, as_stream, is_path, output_stream, portable, read_bytes
+)
 
-def img_to_pdf(image_paths: List[str], output_file: str, 
-               single_pdf_per_image: bool = False) -> bool:
+# Pixels per inch used to size pages, as Pillow's PDF writer did before
+RESOLUTION = 100.0
+# Quality used when an image has to be decoded and re-encoded
+JPEG_QUALITY = 75
+# Fewer images than this are prepared in-process; dispatch would dominate
+PARALLEL_MIN_IMAGES = 4
+
+
+def img_to_pdf(image_paths: List[Source], output_file: Destination,
+               single_pdf_per_image: bool = False, workers: Optional[int] = None) -> bool:
     """
     Convert one or more images to PDF.
-    
+
+    Pages are written one at a time, so memory stays flat however many images
+    there are. Baseline RGB and grayscale JPEGs are embedded as-is without
+    decoding; other images are flattened onto white and re-encoded across a
+    process pool, with page order kept.
+
     Args:
-        image_paths: List of paths to image files
-        output_file: Path to the output PDF file (or directory if single_pdf_per_image=True)
+        image_paths: Images as paths, bytes or binary file objects
+        output_file: Path to the output PDF file or a writable binary stream
+                     (a directory path if single_pdf_per_image=True; streams
+                     are rejected there, see img_to_pdfs)
         single_pdf_per_image: If True, create separate PDF for each image
-        
+        workers: Number of worker processes (default: all cores)
+
     Returns:
         True if successful, False otherwise
     """
     try:
         if not image_paths:
             raise ValueError("No image files provided")
-        
+
         # Validate all input files exist
         supported_formats = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
         for file_path in image_paths:
+            if not is_path(file_path):
+                continue  # Pillow checks the format of in-memory images
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Image file not found: {file_path}")
             ext = os.path.splitext(file_path)[1].lower()
             if ext not in supported_formats:
                 raise ValueError(f"Unsupported image format: {ext}")
-        
+
         if single_pdf_per_image:
+            if not is_path(output_file):
+                raise ValueError("single_pdf_per_image writes one file per image and needs an "
+                                 "output directory path, not a stream; use img_to_pdfs for streams")
             # Create separate PDF for each image
             output_dir = output_file if os.path.isdir(output_file) else os.path.dirname(output_file)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir, exist_ok=True)
-            
-            for img_path in image_paths:
-                base_name = os.path.splitext(os.path.basename(img_path))[0]
-                pdf_path = os.path.join(output_dir, f"{base_name}.pdf")
-                
-                image = Image.open(img_path)
-                # Convert RGBA to RGB if necessary
-                if image.mode == 'RGBA':
-                    rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                    rgb_image.paste(image, mask=image.split()[3])
-                    image = rgb_image
-                elif image.mode != 'RGB':
-                    image = image.convert('RGB')
-                
-                image.save(pdf_path, 'PDF', resolution=100.0)
+            pdf_paths = [
+                os.path.join(output_dir, f"{os.path.splitext(os.path.basename(p))[0]}.pdf")
+                for p in image_paths
+            ]
+            return all(img_to_pdfs(image_paths, pdf_paths, workers))
         else:
             # Create single PDF with all images
-            output_dir = os.path.dirname(output_file)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir, exist_ok=True)
-            
-            images = []
-            for img_path in image_paths:
-                image = Image.open(img_path)
-                # Convert RGBA to RGB if necessary
-                if image.mode == 'RGBA':
-                    rgb_image = Image.new('RGB', image.size, (255, 255, 255))
-                    rgb_image.paste(image, mask=image.split()[3])
-                    image = rgb_image
-                elif image.mode != 'RGB':
-                    image = image.convert('RGB')
-                images.append(image)
-            
-            if images:
-                images[0].save(
-                    output_file,
-                    'PDF',
-                    resolution=100.0,
-                    save_all=True,
-                    append_images=images[1:] if len(images) > 1 else []
-                )
-        
+            report_pages(len(image_paths))
+            _write_pdf(image_paths, output_file, workers)
+
         return True
-        
+
     except Exception as e:
         print(f"Error converting images to PDF: {str(e)}")
         return False
 
+
+def img_to_pdfs(image_paths: List[Source], output_files: List[Destination],
+                workers: Optional[int] = None) -> List[bool]:
+    """
+    Convert each image to its own PDF, several at a time.
+
+    Args:
+        image_paths: Images as paths, bytes or binary file objects
+        output_files: Output PDF path (or writable stream) for each image, in the same order
+        workers: Number of worker processes (default: all cores)
+
+    Returns:
+        Whether each conversion succeeded, in input order
+    """
+    report_pages(len(image_paths))
+    workers = workers or default_workers()
+    # Streams cannot be handed to other processes
+    if workers <= 1 or len(image_paths) < 2 or not all(is_path(o) for o in output_files):
+        results = map(_convert_single, image_paths, output_files)
+    else:
+        results = ordered_map(
+            process_pool(), _convert_single, ((portable(i), o) for i, o in zip(image_paths, output_files)), workers * 2
+        )
+    converted = []
+    for ok in results:
+        converted.append(ok)
+        report_pages_done()
+    return converted
+
+
+def _convert_single(img_path: Source, output_file: Destination) -> bool:
+    try:
+        _write_pdf([img_path], output_file, workers=1)
+        return True
+    except Exception as e:
+        name = os.path.basename(img_path) if is_path(img_path) else 'image'
+        print(f"Error converting {name} to PDF: {str(e)}")
+        return False
+
+
+def _write_pdf(image_paths: List[Source], output_file: Destination, workers: Optional[int] = None):
+    """Stream one page per image into output_file."""
+    workers = workers or default_workers()
+    if workers > 1 and len(image_paths) >= PARALLEL_MIN_IMAGES:
+        image_paths = [portable(p) for p in image_paths]
+        # A couple of images per worker in flight keeps cores busy without hoarding results
+        prepared = ordered_map(process_pool(), _prepare_image, ((p,) for p in image_paths), workers * 2)
+    else:
+        prepared = map(_prepare_image, image_paths)
+    try:
+        with output_stream(output_file) as f:
+            writer = StreamingPdfWriter(f)
+            pages_ref = writer.reserve()
+            catalog_ref = writer.reserve()
+            kids = []
+
+            for img_path, (width, height, colorspace, data) in zip(image_paths, prepared):
+                if data is None:
+                    # Embeddable JPEG: copy the DCT stream straight from the file
+                    data = read_bytes(img_path)
+                image_stream = _image_xobject(width, height, colorspace, data)
+                page_w = width * 72.0 / RESOLUTION
+                page_h = height * 72.0 / RESOLUTION
+
+                image_ref = writer.reserve()
+                writer.write(image_ref, image_stream)
+
+                content = StreamObject()
+                content._data = f"q {page_w:.4f} 0 0 {page_h:.4f} 0 0 cm /Im0 Do Q".encode()
+                content_ref = writer.reserve()
+                writer.write(content_ref, content)
+
+                page_ref = writer.reserve()
+                writer.write(page_ref, DictionaryObject({
+                    NameObject('/Type'): NameObject('/Page'),
+                    NameObject('/Parent'): pages_ref,
+                    NameObject('/MediaBox'): ArrayObject([
+                        NumberObject(0), NumberObject(0), FloatObject(page_w), FloatObject(page_h)
+                    ]),
+                    NameObject('/Resources'): DictionaryObject({
+                        NameObject('/XObject'): DictionaryObject({NameObject('/Im0'): image_ref}),
+                    }),
+                    NameObject('/Contents'): content_ref,
+                }))
+                kids.append(page_ref)
+                report_pages_done()
+
+            writer.write(pages_ref, DictionaryObject({
+                NameObject('/Type'): NameObject('/Pages'),
+                NameObject('/Kids'): ArrayObject(kids),
+                NameObject('/Count'): NumberObject(len(kids)),
+            }))
+            writer.write(catalog_ref, DictionaryObject({
+                NameObject('/Type'): NameObject('/Catalog'),
+                NameObject('/Pages'): pages_ref,
+            }))
+            writer.close(catalog_ref)
+    finally:
+        # Cancels images not yet prepared if writing failed
+        if hasattr(prepared, 'close'):
+            prepared.close()
+
+
+def _prepare_image(img_path: Source):
+    """
+    Work out how an image goes into the PDF; runs in a worker process.
+
+    Returns:
+        (width, height, colorspace, data) where data is re-encoded JPEG bytes,
+        or None when the file itself can be embedded
+    """
+    with Image.open(as_stream(img_path)) as image:
+        width, height = image.size
+        if _embeddable_jpeg(image):
+            colorspace = '/DeviceRGB' if image.mode == 'RGB' else '/DeviceGray'
+            return width, height, colorspace, None
+        return width, height, '/DeviceRGB', _reencode(image)
+
+
+def _image_xobject(width: int, height: int, colorspace: str, data: bytes) -> StreamObject:
+    """Build the image XObject for DCT-encoded data."""
+    stream = StreamObject()
+    stream.update({
+        NameObject('/Type'): NameObject('/XObject'),
+        NameObject('/Subtype'): NameObject('/Image'),
+        NameObject('/Width'): NumberObject(width),
+        NameObject('/Height'): NumberObject(height),
+        NameObject('/ColorSpace'): NameObject(colorspace),
+        NameObject('/BitsPerComponent'): NumberObject(8),
+        NameObject('/Filter'): NameObject('/DCTDecode'),
+    })
+    stream._data = data
+    return stream
+
+
+def _embeddable_jpeg(image: Image.Image) -> bool:
+    """Whether the file's JPEG data can go into the PDF unchanged."""
+    return (
+        image.format == 'JPEG'
+        and image.mode in ('RGB', 'L')
+        and not image.info.get('progressive')
+        and not image.info.get('progression')
+    )
+
+
+def _reencode(image: Image.Image) -> bytes:
+    """Decode an image, flatten transparency onto white and encode it as JPEG."""
+    if image.mode == 'RGBA':
+        rgb_image = Image.new('RGB', image.size, (255, 255, 255))
+        rgb_image.paste(image, mask=image.split()[3])
+        image = rgb_image
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+    buf = io.BytesIO()
+    image.save(buf, 'JPEG', quality=JPEG_QUALITY)
+    return buf.getvalue()
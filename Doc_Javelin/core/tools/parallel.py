@@ -0,0 +1,107 @@
+"""
+Helpers for spreading tool work across worker processes.
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    """
+    Worker process budget for this process: DOC_JAVELIN_WORKERS, or one
+    per core. The shared pool never grows past it.
+    """
+    env = os.environ.get('DOC_JAVELIN_WORKERS')
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+def process_pool() -> ProcessPoolExecutor:
+    """
+    Return the process-wide worker pool, starting it on first use.
+    
+    Every tool call shares this one pool of default_workers() processes, so
+    concurrent requests queue for the same workers instead of each starting
+    their own, and workers stay warm between calls. Callers must not shut
+    it down; they cancel their own unfinished futures instead (ordered_map
+    and completed_map do this when the consumer stops early).
+    
+    Forking a process that runs other threads (server threads, the job
+    pool) can deadlock the child, so workers come from a forkserver where
+    the platform has one.
+    """
+    global _pool
+    with _pool_lock:
+        # A worker that died (e.g. killed for memory) breaks the whole pool
+        if _pool is None or getattr(_pool, '_broken', False):
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+            _pool = ProcessPoolExecutor(max_workers=default_workers(), mp_context=ctx)
+        return _pool
+
+
+def chunk_ranges(total: int, chunks: int) -> List[Tuple[int, int]]:
+    """Split range(total) into at most `chunks` contiguous (start, stop) pairs."""
+    chunks = max(1, min(chunks, total))
+    size, extra = divmod(total, chunks)
+    ranges = []
+    start = 0
+    for i in range(chunks):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def ordered_map(pool: Executor, func: Callable, items: Iterable, window: int) -> Iterator:
+    """
+    Like pool.map, but with at most `window` calls in flight.
+    
+    Results come back in input order; because submission stops until the
+    oldest result is taken, finished results never pile up in memory behind
+    a slow one. Calls not yet started are cancelled if the consumer stops
+    early.
+    """
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(pool.submit(func, *item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def completed_map(pool: Executor, func: Callable, items: Iterable, window: int) -> Iterator:
+    """
+    Like ordered_map, but results come back as calls finish, not in input
+    order.
+    """
+    pending = set()
+    try:
+        for item in items:
+            pending.add(pool.submit(func, *item))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
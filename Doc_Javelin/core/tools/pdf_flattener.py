@@ -6,41 +6,68 @@ Merges annotation layers (text, drawings, highlights) onto a PDF using PyMuPDF (
 import fitz  # PyMuPDF
 import os
 import json
+import shutil
 
+from .pdf_incremental import use_incremental
+from .reporting import report_pages
+from .streams import is_path, open_document, save_document
 
-def flatten_pdf_with_layers(input_pdf_path: str, layers: list, output_pdf_path: str) -> bool:
+
+# Layer types drawn with vector operators rather than text or images
+DRAWING_TYPES = ('path', 'rect')
+TEXT_TYPES = ('text', 'i-text')
+
+
+def flatten_pdf_with_layers(input_pdf_path: str, layers: list, output_pdf_path: str,
+                            compact=None) -> bool:
     """
     Flatten layers onto a PDF file.
     
+    Layers are grouped by page and each page is drawn in one pass: runs of
+    text and vector layers share a single content stream, and every
+    distinct image is decoded and embedded once, then referenced wherever
+    it is placed. Stacking order within a page follows the request.
+    
     Args:
-        input_pdf_path: Path to the original PDF file
+        input_pdf_path: Path to the original PDF file, or its bytes or a binary file object
         layers: List of layer dictionaries with type, position, and properties
-        output_pdf_path: Path where the flattened PDF will be saved
+        output_pdf_path: Path where the flattened PDF will be saved, or a writable binary stream
+        compact: True rewrites the whole file with unused objects removed;
+                 False appends an incremental update to an unchanged copy of
+                 the original, so the work is proportional to the edit;
+                 None (default) updates large files incrementally.
+                 Only paths can be updated incrementally, and only files
+                 that can be appended to (see supports_incremental).
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        doc = fitz.open(input_pdf_path)
+        incremental = (is_path(input_pdf_path) and is_path(output_pdf_path)
+                       and use_incremental(input_pdf_path, compact))
+        if incremental:
+            # Edit a byte-for-byte copy in place, then append only what changed
+            shutil.copyfile(input_pdf_path, output_pdf_path)
+            doc = fitz.open(output_pdf_path)
+        else:
+            doc = open_document(input_pdf_path)
+        report_pages(doc.page_count)
         
-        for layer in layers:
-            page_num = layer.get('pageNum', 1) - 1  # Convert to 0-indexed
-            if page_num < 0 or page_num >= len(doc):
-                continue
-                
-            page = doc[page_num]
-            layer_type = layer.get('type', '')
-            
-            if layer_type == 'text' or layer_type == 'i-text':
-                _add_text_layer(page, layer)
-            elif layer_type == 'path':
-                _add_path_layer(page, layer)
-            elif layer_type == 'rect':
-                _add_rect_layer(page, layer)
-            elif layer_type == 'image':
-                _add_image_layer(page, layer)
+        _flatten_layers(doc, layers)
         
-        doc.save(output_pdf_path)
+        if incremental and doc.can_save_incrementally():
+            doc.saveIncr()
+        elif incremental:
+            # A repaired file cannot be appended to; rewrite the copy instead
+            temp_path = output_pdf_path + '.tmp'
+            doc.save(temp_path)
+            doc.close()
+            os.replace(temp_path, output_pdf_path)
+            return True
+        elif compact:
+            save_document(doc, output_pdf_path, garbage=3, deflate=True)
+        else:
+            save_document(doc, output_pdf_path)
         doc.close()
         return True
         
@@ -49,11 +76,58 @@ def flatten_pdf_with_layers(input_pdf_path: str, layers: list, output_pdf_path:
         return False
 
 
-def _add_text_layer(page, layer: dict):
-    """Add text annotation to page."""
+def _flatten_layers(doc, layers: list):
+    """Draw every layer onto its page of an open document."""
+    by_page = {}
+    for layer in layers:
+        page_num = layer.get('pageNum', 1) - 1  # Convert to 0-indexed
+        if 0 <= page_num < len(doc):
+            by_page.setdefault(page_num, []).append(layer)
+    
+    # data URI -> xref of the embedded image, shared by every page
+    images = {}
+    for page_num in sorted(by_page):
+        _flatten_page(doc[page_num], by_page[page_num], images)
+
+
+def _flatten_page(page, layers: list, images: dict):
+    """Draw one page's layers in order, committing shapes only when z-order requires it."""
+    shape = None
+    has_text = False
+    
+    for layer in layers:
+        layer_type = layer.get('type', '')
+        
+        # A shape writes its text after its drawings, so a drawing that must
+        # cover earlier text (or any image) starts a new shape
+        if shape is not None and (layer_type == 'image' or (layer_type in DRAWING_TYPES and has_text)):
+            shape.commit()
+            shape, has_text = None, False
+        
+        if layer_type == 'image':
+            _add_image_layer(page, layer, images)
+            continue
+        if layer_type not in TEXT_TYPES and layer_type not in DRAWING_TYPES:
+            continue
+        
+        if shape is None:
+            shape = page.new_shape()
+        if layer_type in TEXT_TYPES:
+            has_text = _add_text_layer(shape, layer) or has_text
+        elif layer_type == 'path':
+            _add_path_layer(shape, layer)
+        elif layer_type == 'rect':
+            _add_rect_layer(shape, layer)
+    
+    if shape is not None:
+        shape.commit()
+
+
+def _add_text_layer(shape, layer: dict) -> bool:
+    """Add text annotation to the page's shape; returns whether anything was written."""
     text = layer.get('text', '')
     if not text:
-        return
+        return False
         
     x = layer.get('left', 0)
     y = layer.get('top', 0)
@@ -70,17 +144,18 @@ def _add_text_layer(page, layer: dict):
     
     # Insert text
     point = fitz.Point(x, y + font_size)  # fitz uses bottom-left for text
-    page.insert_text(
+    shape.insert_text(
         point,
         text,
         fontsize=font_size,
         color=color,
         fontname="helv"  # Helvetica
     )
+    return True
 
 
-def _add_path_layer(page, layer: dict):
-    """Add freehand drawing path to page."""
+def _add_path_layer(shape, layer: dict):
+    """Add freehand drawing path to the page's shape."""
     path_data = layer.get('path', [])
     if not path_data:
         return
@@ -91,8 +166,6 @@ def _add_path_layer(page, layer: dict):
     
     # Convert Fabric.js path to PyMuPDF shape
     # Fabric.js path format: [["M", x, y], ["L", x, y], ...]
-    shape = page.new_shape()
-    
     for cmd in path_data:
         if not cmd or len(cmd) < 3:
             continue
@@ -107,11 +180,11 @@ def _add_path_layer(page, layer: dict):
             pass
     
     # For simplicity, just draw points as small circles for now
-    shape.commit(color=color, fill=None, width=stroke_width)
+    shape.finish(color=color, fill=None, width=stroke_width)
 
 
-def _add_rect_layer(page, layer: dict):
-    """Add rectangle shape to page."""
+def _add_rect_layer(shape, layer: dict):
+    """Add rectangle shape to the page's shape."""
     x = layer.get('left', 0)
     y = layer.get('top', 0)
     width = layer.get('width', 50) * layer.get('scaleX', 1)
@@ -125,14 +198,12 @@ def _add_rect_layer(page, layer: dict):
     fill_color = hex_to_rgb(fill_hex) if fill_hex and fill_hex != 'transparent' else None
     stroke_color = hex_to_rgb(stroke_hex)
     
-    shape = page.new_shape()
     shape.draw_rect(rect)
     shape.finish(color=stroke_color, fill=fill_color)
-    shape.commit()
 
 
-def _add_image_layer(page, layer: dict):
-    """Add image to page from Base64 or bytes."""
+def _add_image_layer(page, layer: dict, images: dict):
+    """Add image to page from Base64, embedding each distinct image only once."""
     src = layer.get('src', '')
     if not src:
         return
@@ -141,6 +212,16 @@ def _add_image_layer(page, layer: dict):
     y = layer.get('top', 0)
     width = layer.get('width', 100)
     height = layer.get('height', 100)
+    rect = fitz.Rect(x, y, x + width, y + height)
+    
+    xref = images.get(src)
+    if xref:
+        # Already embedded: place another reference to the same object
+        try:
+            page.insert_image(rect, xref=xref)
+        except Exception as e:
+            print(f"Error inserting image: {e}")
+        return
     
     # Handle Base64
     import base64
@@ -159,9 +240,8 @@ def _add_image_layer(page, layer: dict):
         return
         
     if image_data:
-        rect = fitz.Rect(x, y, x + width, y + height)
         try:
-            page.insert_image(rect, stream=image_data)
+            images[src] = page.insert_image(rect, stream=image_data)
         except Exception as e:
             print(f"Error inserting image: {e}")
 
@@ -0,0 +1,200 @@
+"""
+Incremental PDF updates - append changed objects to an unchanged copy of the original.
+"""
+
+import io
+import os
+import re
+import shutil
+import struct
+import zlib
+from typing import Dict, Optional, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject, PdfObject
+
+# Below this input size a full rewrite is cheap enough to be the default
+INCREMENTAL_MIN_BYTES = 16 * 1024 * 1024
+
+# How much of the end of the file is searched for the last startxref;
+# writers may leave padding or comments after %%EOF
+TAIL_BYTES = 64 * 1024
+HEAD_BYTES = 1024
+
+STARTXREF_RE = re.compile(rb'startxref\s+(\d+)\s*%%EOF')
+XREF_START_RE = re.compile(rb'\s*(xref|\d+\s+\d+\s+obj)')
+
+
+def use_incremental(input_path: str, compact=None) -> bool:
+    """
+    Decide between an incremental update and a full rewrite.
+
+    Files that cannot be appended to (see supports_incremental) are always
+    rewritten.
+
+    Args:
+        input_path: Path to the source PDF
+        compact: True forces a full (compacting) rewrite, False asks for an
+                 incremental update, None picks by file size
+    """
+    if compact or (compact is None and os.path.getsize(input_path) < INCREMENTAL_MIN_BYTES):
+        return False
+    return supports_incremental(input_path)
+
+
+def supports_incremental(input_path: str) -> bool:
+    """
+    Whether an update can be appended to this file.
+
+    It cannot when the last cross-reference section cannot be found near
+    the end of the file, when the file is linearized (its first-page
+    cross-reference would go stale), or when it has a hybrid cross-reference
+    (a table plus an /XRefStm stream), whose objects the appended section
+    would not chain to.
+    """
+    try:
+        with open(input_path, 'rb') as f:
+            head = f.read(HEAD_BYTES)
+        tail = _tail(input_path)
+        return (find_startxref(input_path, tail) is not None
+                and b'/Linearized' not in head and b'/XRefStm' not in tail)
+    except OSError:
+        return False
+
+
+def find_startxref(input_path: str, tail: Optional[bytes] = None) -> Optional[int]:
+    """Offset of the file's last cross-reference section, or None if it cannot be found."""
+    if tail is None:
+        tail = _tail(input_path)
+    matches = list(STARTXREF_RE.finditer(tail))
+    if not matches:
+        return None
+    offset = int(matches[-1].group(1))
+    with open(input_path, 'rb') as f:
+        f.seek(offset)
+        # A stale or damaged offset would chain the update to garbage
+        return offset if XREF_START_RE.match(f.read(64)) else None
+
+
+def _tail(input_path: str) -> bytes:
+    with open(input_path, 'rb') as f:
+        f.seek(max(0, os.path.getsize(input_path) - TAIL_BYTES))
+        return f.read()
+
+
+def write_incremental_update(reader: PdfReader, input_path: str, output_path: str,
+                             changed: Dict[int, Tuple[int, PdfObject]]) -> int:
+    """
+    Copy input_path to output_path byte for byte and append an update section.
+
+    Only the objects in `changed` are written, followed by a cross-reference
+    section (a table or a stream, matching the original) whose /Prev points
+    at the original one, so the work is proportional to the edit rather than
+    the document.
+
+    Args:
+        reader: PdfReader over input_path
+        input_path: Path to the source PDF
+        output_path: Path of the updated PDF
+        changed: Object number -> (generation, new object) for every object to rewrite
+
+    Returns:
+        Number of bytes appended
+    """
+    if reader.is_encrypted:
+        raise ValueError("Incremental updates of encrypted PDFs are not supported")
+
+    tail = _tail(input_path)
+    prev = find_startxref(input_path, tail)
+    if prev is None:
+        raise ValueError("Could not locate the original cross-reference section")
+    with open(input_path, 'rb') as f:
+        f.seek(prev)
+        xref_is_stream = not f.read(64).lstrip().startswith(b'xref')
+
+    # The OS can copy (or reflink) the original without passing it through Python
+    shutil.copyfile(input_path, output_path)
+
+    buf = io.BytesIO()
+    base = os.path.getsize(output_path)
+    if not tail.endswith((b'\n', b'\r')):
+        buf.write(b'\n')
+
+    offsets = {}
+    for idnum in sorted(changed):
+        generation, obj = changed[idnum]
+        offsets[idnum] = (base + buf.tell(), generation)
+        buf.write(f"{idnum} {generation} obj\n".encode())
+        obj.write_to_stream(buf)
+        buf.write(b"\nendobj\n")
+
+    trailer = reader.trailer
+    size = max([int(trailer.get('/Size', 0))] + [n + 1 for n in offsets])
+    root = trailer.raw_get('/Root')
+    entries = [f"/Size {size}", f"/Root {root.idnum} {root.generation} R", f"/Prev {prev}"]
+    if '/Info' in trailer:
+        info = trailer.raw_get('/Info')
+        if isinstance(info, IndirectObject):
+            entries.append(f"/Info {info.idnum} {info.generation} R")
+    if '/ID' in trailer:
+        ids = trailer['/ID']
+        entries.append(f"/ID [<{_id_bytes(ids[0]).hex()}> <{_id_bytes(ids[1]).hex()}>]")
+
+    xref_offset = base + buf.tell()
+    if xref_is_stream:
+        _write_xref_stream(buf, offsets, size, entries, xref_offset)
+    else:
+        _write_xref_table(buf, offsets, entries)
+    buf.write(f"startxref\n{xref_offset}\n%%EOF\n".encode())
+
+    with open(output_path, 'ab') as f:
+        f.write(buf.getvalue())
+    return buf.tell()
+
+
+def _id_bytes(value) -> bytes:
+    """Raw bytes of a file identifier, which pypdf may have decoded as text."""
+    if isinstance(value, bytes):
+        return value
+    return getattr(value, 'original_bytes', None) or str(value).encode('latin-1')
+
+
+def _subsections(numbers):
+    """Group sorted object numbers into runs of consecutive numbers."""
+    runs = []
+    for n in numbers:
+        if runs and n == runs[-1][-1] + 1:
+            runs[-1].append(n)
+        else:
+            runs.append([n])
+    return runs
+
+
+def _write_xref_table(buf, offsets, entries):
+    # Restating the head of the free list keeps strict readers from renumbering
+    buf.write(b"xref\n0 1\n0000000000 65535 f \n")
+    for run in _subsections(sorted(offsets)):
+        buf.write(f"{run[0]} {len(run)}\n".encode())
+        for n in run:
+            offset, generation = offsets[n]
+            buf.write(f"{offset:010d} {generation:05d} n \n".encode())
+    buf.write(f"trailer\n<< {' '.join(entries)} >>\n".encode())
+
+
+def _write_xref_stream(buf, offsets, size, entries, xref_offset):
+    # The stream describes itself too, as the object after the last one
+    own_number = size
+    offsets = dict(offsets)
+    offsets[own_number] = (xref_offset, 0)
+    runs = _subsections(sorted(offsets))
+    rows = b''.join(
+        struct.pack('>BQH', 1, offsets[n][0], offsets[n][1]) for run in runs for n in run
+    )
+    data = zlib.compress(rows)
+    index = ' '.join(f"{run[0]} {len(run)}" for run in runs)
+    entries = [e for e in entries if not e.startswith('/Size')]
+    entries += [f"/Size {own_number + 1}", "/Type /XRef", "/W [1 8 2]", f"/Index [{index}]",
+                "/Filter /FlateDecode", f"/Length {len(data)}"]
+    buf.write(f"{own_number} 0 obj\n<< {' '.join(entries)} >>\nstream\n".encode())
+    buf.write(data)
+    buf.write(b"\nendstream\nendobj\n")
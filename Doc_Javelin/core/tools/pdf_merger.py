@@ -3,17 +3,36 @@ PDF Merger Tool - Merge multiple PDF files into a single PDF.
 """
 
 import os
-from typing import List
+from typing import List, Optional
 from pypdf import PdfWriter, PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
 
+from .reporting import report_pages, report_pages_done
+from .streams import (
+    Destination, Source, StreamingPdfWriter, as_stream, is_path, output_stream, source_name, source_size
+)
 
-def merge_pdfs(input_files: List[str], output_file: str) -> bool:
+# Above this much total input, merge_pdfs switches to the streaming engine
+STREAMING_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+
+def merge_pdfs(input_files: List[Source], output_file: Destination,
+               streaming: Optional[bool] = None) -> bool:
     """
     Merge multiple PDF files into a single PDF.
     
     Args:
-        input_files: List of paths to PDF files to merge
-        output_file: Path to the output merged PDF file
+        input_files: PDF files to merge: paths, bytes or binary file objects
+        output_file: Path to the output merged PDF file, or a writable binary stream
+        streaming: Use the constant-memory streaming engine. None picks it
+                   automatically once the inputs exceed STREAMING_THRESHOLD_BYTES.
         
     Returns:
         True if successful, False otherwise
@@ -24,26 +43,34 @@ def merge_pdfs(input_files: List[str], output_file: str) -> bool:
         
         # Validate all input files exist
         for file_path in input_files:
+            if not is_path(file_path):
+                continue
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Input file not found: {file_path}")
-            if not file_path.lower().endswith('.pdf'):
+            if not source_name(file_path).lower().endswith('.pdf'):
                 raise ValueError(f"Not a PDF file: {file_path}")
         
-        # Create output directory if it doesn't exist
-        output_dir = os.path.dirname(output_file)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir, exist_ok=True)
+        if streaming is None:
+            total_size = sum(source_size(p) for p in input_files)
+            streaming = total_size > STREAMING_THRESHOLD_BYTES
+        
+        if streaming:
+            with output_stream(output_file) as output:
+                stream_merge_pdfs(input_files, output)
+            return True
         
         # Merge PDFs
         merger = PdfWriter()
         
         for file_path in input_files:
-            reader = PdfReader(file_path)
+            reader = PdfReader(as_stream(file_path))
+            report_pages(len(reader.pages))
             for page in reader.pages:
                 merger.add_page(page)
+                report_pages_done()
         
         # Write merged PDF
-        with open(output_file, 'wb') as output:
+        with output_stream(output_file) as output:
             merger.write(output)
         
         return True
@@ -52,3 +79,115 @@ def merge_pdfs(input_files: List[str], output_file: str) -> bool:
         print(f"Error merging PDFs: {str(e)}")
         return False
 
+
+
+def stream_merge_pdfs(input_files: List[Source], output) -> int:
+    """
+    Merge PDF files by writing each copied object straight to the output.
+    
+    Only one input is open at a time and its parsed objects are dropped after
+    every page, so peak memory is bounded by the largest page rather than the
+    combined size of all inputs. Like merge_pdfs, only pages (with their
+    resources and annotations) are carried over.
+    
+    Args:
+        input_files: PDF files to merge: paths, bytes or binary file objects
+        output: Writable binary stream
+        
+    Returns:
+        Number of pages written
+    """
+    writer = StreamingPdfWriter(output)
+    pages_ref = writer.reserve()
+    catalog_ref = writer.reserve()
+    kids = []
+    
+    for file_path in input_files:
+        reader = PdfReader(as_stream(file_path))
+        report_pages(len(reader.pages))
+        # (idnum, generation) in the input -> reference in the output
+        refs = {key: pages_ref for key in _page_tree_nodes(reader)}
+        
+        page_refs = []
+        for page in reader.pages:
+            ref = writer.reserve()
+            src = page.indirect_reference
+            if src is not None:
+                refs[(src.idnum, src.generation)] = ref
+            page_refs.append(ref)
+        
+        for page, ref in zip(reader.pages, page_refs):
+            pending = []
+            obj = _translate(page, refs, writer, pending, skip=('/Parent',))
+            obj[NameObject('/Parent')] = pages_ref
+            writer.write(ref, obj)
+            
+            while pending:
+                key, ref_out = pending.pop()
+                src_obj = reader.get_object(IndirectObject(key[0], key[1], reader))
+                writer.write(ref_out, _translate(src_obj, refs, writer, pending))
+            
+            # Everything this page needed is on disk now; let the parsed objects go
+            reader.resolved_objects.clear()
+            report_pages_done()
+        
+        kids.extend(page_refs)
+        del reader
+    
+    writer.write(pages_ref, DictionaryObject({
+        NameObject('/Type'): NameObject('/Pages'),
+        NameObject('/Kids'): ArrayObject(kids),
+        NameObject('/Count'): NumberObject(len(kids)),
+    }))
+    writer.write(catalog_ref, DictionaryObject({
+        NameObject('/Type'): NameObject('/Catalog'),
+        NameObject('/Pages'): pages_ref,
+    }))
+    writer.close(catalog_ref)
+    return len(kids)
+
+
+def _page_tree_nodes(reader: PdfReader) -> set:
+    """Collect references to the intermediate /Pages nodes of a document."""
+    nodes = set()
+    root = reader.trailer['/Root'].get('/Pages')
+    stack = [root] if isinstance(root, IndirectObject) else []
+    while stack:
+        ref = stack.pop()
+        key = (ref.idnum, ref.generation)
+        if key in nodes:
+            continue
+        node = ref.get_object()
+        if node.get('/Type') != '/Pages':
+            continue
+        nodes.add(key)
+        stack.extend(k for k in node.get('/Kids', []) if isinstance(k, IndirectObject))
+    return nodes
+
+
+def _translate(obj, refs: dict, writer, pending: list, skip=()):
+    """Copy obj with every indirect reference renumbered for the output."""
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        ref = refs.get(key)
+        if ref is None:
+            ref = writer.reserve()
+            refs[key] = ref
+            pending.append((key, ref))
+        return ref
+    if isinstance(obj, StreamObject):
+        out = obj.__class__()
+        for k, v in dict.items(obj):
+            if k != '/Length':
+                out[NameObject(k)] = _translate(v, refs, writer, pending)
+        out._data = obj._data
+        return out
+    if isinstance(obj, DictionaryObject):
+        out = DictionaryObject()
+        for k, v in dict.items(obj):
+            if k not in skip:
+                out[NameObject(k)] = _translate(v, refs, writer, pending)
+        return out
+    if isinstance(obj, ArrayObject):
+        return ArrayObject(_translate(v, refs, writer, pending) for v in list.__iter__(obj))
+    return obj
@@ -0,0 +1,117 @@
+"""
+PDF Thumbnails - Render page previews at a requested width.
+"""
+
+import fitz  # PyMuPDF
+from typing import Iterator, List, Optional, Tuple
+
+from .parallel import completed_map, default_workers, process_pool
+from .reporting import report_pages
+from .streams import Source, open_document, portable
+
+# Bump when rendering changes so cached thumbnails are not reused
+THUMBNAIL_CACHE_VERSION = 2
+
+MIN_WIDTH = 16
+MAX_WIDTH = 2000
+# Tall, narrow pages are rendered narrower than asked so the image stays
+# within this height; a whole Letter or A4 page fits at MAX_WIDTH
+MAX_HEIGHT = 4000
+ROTATIONS = (0, 90, 180, 270)
+# Image formats a thumbnail can be encoded as, with their content types
+FORMATS = {'png': 'image/png', 'jpeg': 'image/jpeg'}
+JPEG_QUALITY = 80
+
+# Fewer pages than this are rendered in-process. With the pool warm a call
+# costs a few ms plus ~0.5 ms/page of transfer, against 2-5 ms/page to render
+PARALLEL_MIN_PAGES = 8
+# Pages per pool task: small enough that the first results arrive quickly
+PAGES_PER_TASK = 4
+
+
+def render_thumbnail(pdf_path: Source, page_num: int, width: int,
+                     rotation: int = 0, fmt: str = 'png') -> Optional[bytes]:
+    """
+    Render one PDF page as an image.
+
+    Args:
+        pdf_path: Path to the PDF file, or its bytes or a binary file object
+        page_num: Page number (1-based)
+        width: Width of the image in pixels (after rotation); less if the
+               height would otherwise exceed MAX_HEIGHT
+        rotation: Extra clockwise rotation: 0, 90, 180 or 270
+        fmt: 'png' or 'jpeg'
+
+    Returns:
+        Encoded image bytes, or None if error
+    """
+    try:
+        with open_document(pdf_path) as doc:
+            if page_num < 1 or page_num > len(doc):
+                return None
+            report_pages(1)
+            return _render_page(doc[page_num - 1], width, rotation, fmt)
+    except Exception as e:
+        print(f"Error rendering PDF thumbnail: {e}")
+        return None
+
+
+def iter_thumbnails(pdf_path: Source, width: int, rotation: int = 0, fmt: str = 'png',
+                    page_nums: Optional[List[int]] = None,
+                    workers: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """
+    Render many pages, yielding (page_num, image bytes) as each is ready.
+
+    Small jobs run in-process with the document opened once. Larger ones are
+    split into batches of pages across a process pool; batches are yielded
+    in completion order, so pages may arrive out of order.
+
+    Args:
+        pdf_path: Path to the PDF file, or its bytes or a binary file object
+        width, rotation, fmt: As for render_thumbnail
+        page_nums: 1-based page numbers to render (default: every page)
+        workers: Number of worker processes (default: all cores)
+    """
+    if page_nums is None:
+        with open_document(pdf_path) as doc:
+            page_nums = list(range(1, len(doc) + 1))
+    workers = workers or default_workers()
+
+    if workers <= 1 or len(page_nums) < PARALLEL_MIN_PAGES:
+        yield from _render_pages(pdf_path, page_nums, width, rotation, fmt)
+        return
+
+    batches = [page_nums[i:i + PAGES_PER_TASK] for i in range(0, len(page_nums), PAGES_PER_TASK)]
+    pdf_path = portable(pdf_path)
+    # Batches not yet started are dropped if the consumer stops early (e.g. the client went away)
+    for results in completed_map(process_pool(), _render_pages, ((pdf_path, batch, width, rotation, fmt) for batch in batches), workers):
+        yield from results
+
+
+def _render_pages(pdf_path: Source, page_nums: List[int], width: int,
+                  rotation: int, fmt: str) -> List[Tuple[int, bytes]]:
+    """Render several pages with one open document; runs in a worker process."""
+    with open_document(pdf_path) as doc:
+        return [(n, _render_page(doc[n - 1], width, rotation, fmt))
+                for n in page_nums if 1 <= n <= len(doc)]
+
+
+def _render_page(page, width: int, rotation: int, fmt: str) -> bytes:
+    """Rasterize a page so that, once rotated, it is `width` pixels wide and at most MAX_HEIGHT tall."""
+    if rotation not in ROTATIONS:
+        raise ValueError(f"Unsupported rotation: {rotation}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported thumbnail format: {fmt}")
+    width = max(MIN_WIDTH, min(int(width), MAX_WIDTH))
+
+    # page.rect already accounts for the page's own /Rotate
+    if rotation in (90, 270):
+        page_width, page_height = page.rect.height, page.rect.width
+    else:
+        page_width, page_height = page.rect.width, page.rect.height
+    zoom = min(width / page_width, MAX_HEIGHT / page_height)
+    matrix = fitz.Matrix(zoom, zoom).prerotate(rotation)
+    pix = page.get_pixmap(matrix=matrix, alpha=False)
+    if fmt == 'jpeg':
+        return pix.tobytes('jpeg', jpg_quality=JPEG_QUALITY)
+    return pix.tobytes('png')
@@ -2,107 +2,280 @@
 PDF to Excel Converter - Extract tables from PDF and convert to Excel.
 """
 
+import csv
+import io
 import os
-import re
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
+import fitz  # PyMuPDF
+import numpy as np
 import pandas as pd
-from pypdf import PdfReader
 
+from .reporting import report_pages, report_pages_done
+from .streams import Destination, Source, is_path, open_document, output_stream, portable, source_name
 
-def extract_tables_from_pdf(pdf_path: str) -> List[List[List[str]]]:
+# Words whose vertical centres are closer than this many line heights share a row
+ROW_TOLERANCE = 0.5
+# A horizontal gap wider than this many line heights starts a new cell
+CELL_GAP = 0.6
+# x positions covered by at most this fraction of rows count as column gutters,
+# so the odd cell spanning several columns does not fuse them together
+GUTTER_FRACTION = 0.1
+
+# MuPDF keeps objects it has parsed for as long as the document is open;
+# reopening every so often keeps long exports at a flat memory footprint
+REOPEN_EVERY_PAGES = 100
+
+OUTPUT_FORMATS = ('xlsx', 'csv', 'parquet')
+# Cells buffered per Parquet row group
+PARQUET_ROW_GROUP_CELLS = 64 * 1024
+
+
+def extract_table_frames(pdf_path: Source) -> List[pd.DataFrame]:
     """
-    Extract tables from PDF file.
+    Extract one table per page from word coordinates.
     
-    This is a basic implementation. For better results, consider using
-    libraries like tabula-py or camelot-py.
+    Words come from PyMuPDF with their bounding boxes. Row bands and column
+    boundaries are found for the whole page at once with NumPy, and each
+    table is built as a DataFrame straight from the resulting grid. Rows
+    with a single cell (headings, running text) are left out.
     
     Args:
-        pdf_path: Path to the PDF file
+        pdf_path: Path to the PDF file, or its bytes or a binary file object
         
     Returns:
-        List of tables, where each table is a list of rows (list of strings)
+        List of DataFrames, one for each page that holds a table
     """
     try:
-        reader = PdfReader(pdf_path)
-        tables = []
-        
-        for page in reader.pages:
-            text = page.extract_text()
-            if not text:
-                continue
-            
-            # Simple table extraction - split by multiple spaces or tabs
-            lines = text.split('\n')
-            table = []
-            
-            for line in lines:
-                # Try to detect table rows (multiple columns separated by spaces/tabs)
-                cells = re.split(r'\s{2,}|\t+', line.strip())
-                if len(cells) > 1:  # Likely a table row
-                    table.append([cell.strip() for cell in cells if cell.strip()])
-            
-            if table:
-                tables.append(table)
-        
-        return tables
+        return [frame for _, frame in iter_table_frames(pdf_path)]
         
     except Exception as e:
         print(f"Error extracting tables from PDF: {str(e)}")
         return []
 
 
-def pdf_to_excel(pdf_path: str, output_file: str, sheet_name: str = "Sheet1") -> bool:
+def iter_table_frames(pdf_path: Source) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """
+    Yield (page_number, DataFrame) for each page holding a table.
+    
+    Pages are read one at a time, so only the current page's words and
+    table are in memory.
+    """
+    # Read a stream once so the document can be reopened from the same bytes
+    pdf_path = portable(pdf_path)
+    doc = open_document(pdf_path)
+    try:
+        report_pages(doc.page_count)
+        for number in range(doc.page_count):
+            if number and number % REOPEN_EVERY_PAGES == 0:
+                doc.close()
+                doc = open_document(pdf_path)
+            frame = _page_table(doc[number].get_text('words'))
+            report_pages_done()
+            if frame is not None:
+                yield number + 1, frame
+    finally:
+        doc.close()
+
+
+def extract_tables_from_pdf(pdf_path: Source) -> List[List[List[str]]]:
     """
-    Convert PDF file to Excel (.xlsx) format by extracting tables.
+    Extract tables from PDF file.
     
     Args:
-        pdf_path: Path to the input PDF file
-        output_file: Path to the output Excel file (.xlsx)
+        pdf_path: Path to the PDF file
+        
+    Returns:
+        List of tables, where each table is a list of rows (list of strings)
+    """
+    return [frame.values.tolist() for frame in extract_table_frames(pdf_path)]
+
+
+def _page_table(words: list) -> Optional[pd.DataFrame]:
+    """Lay out one page's words, as returned by get_text('words'), on a grid."""
+    if not words:
+        return None
+    boxes = np.array([w[:4] for w in words], dtype=float)
+    texts = np.array([w[4] for w in words], dtype=object)
+    line_height = float(np.median(boxes[:, 3] - boxes[:, 1])) or 1.0
+    
+    # Row bands: break wherever consecutive vertical centres jump
+    centres = (boxes[:, 1] + boxes[:, 3]) / 2
+    order = np.argsort(centres, kind='stable')
+    rows = np.empty(len(words), dtype=int)
+    rows[order] = np.concatenate(([0], np.cumsum(np.diff(centres[order]) > line_height * ROW_TOLERANCE)))
+    
+    # Cells: runs of words in a row separated by less than CELL_GAP
+    order = np.lexsort((boxes[:, 0], rows))
+    boxes, texts, rows = boxes[order], texts[order], rows[order]
+    gaps = boxes[1:, 0] - boxes[:-1, 2]
+    new_cell = np.concatenate(([True], (rows[1:] != rows[:-1]) | (gaps > line_height * CELL_GAP)))
+    starts = np.flatnonzero(new_cell)
+    cell_x0 = boxes[starts, 0]
+    cell_x1 = np.maximum.reduceat(boxes[:, 2], starts)
+    cell_row = rows[starts]
+    ends = np.append(starts[1:], len(texts))
+    
+    # Only rows split into several cells belong to the table
+    keep = np.bincount(cell_row)[cell_row] >= 2
+    if not keep.any():
+        return None
+    starts, ends = starts[keep], ends[keep]
+    cell_x0, cell_x1, cell_row = cell_x0[keep], cell_x1[keep], cell_row[keep]
+    row_index, cell_row = np.unique(cell_row, return_inverse=True)
+    n_rows = len(row_index)
+    
+    # Columns: x ranges covered by more than a few rows, found from a coverage profile
+    left = np.floor(cell_x0).astype(int)
+    right = np.ceil(cell_x1).astype(int)
+    offset = left.min()
+    coverage = np.zeros(right.max() - offset + 2, dtype=int)
+    np.add.at(coverage, left - offset, 1)
+    np.add.at(coverage, right - offset, -1)
+    covered = np.cumsum(coverage)[:-1] > n_rows * GUTTER_FRACTION
+    edges = np.diff(np.concatenate(([False], covered, [False])).astype(int))
+    col_ends = np.flatnonzero(edges == -1) + offset
+    if len(col_ends) == 0:
+        return None
+    # A cell belongs to the first column that ends after its left edge
+    cell_col = np.minimum(np.searchsorted(col_ends, cell_x0, side='left'), len(col_ends) - 1)
+    
+    grid = np.full((n_rows, len(col_ends)), '', dtype=object)
+    for r, c, s, e in zip(cell_row, cell_col, starts, ends):
+        text = ' '.join(texts[s:e])
+        grid[r, c] = f"{grid[r, c]} {text}" if grid[r, c] else text
+    
+    # Columns only the discarded single-cell rows used are now empty
+    grid = grid[:, (grid != '').any(axis=0)]
+    return pd.DataFrame(grid)
+
+
+def pdf_to_excel(pdf_path: Source, output_file: Destination, sheet_name: str = "Sheet1",
+                 output_format: Optional[str] = None) -> bool:
+    """
+    Convert PDF file to Excel (.xlsx), CSV or Parquet by extracting tables.
+    
+    Tables are written as each page is extracted, so memory is bounded by
+    one page rather than the whole document.
+    
+    - xlsx: one sheet per table (sheet_name, sheet_name_2, ...), written
+      with openpyxl's write-only mode
+    - csv: every table row in one file, prefixed with its page number
+    - parquet: one record per non-empty cell (page, row, column, value);
+      needs pyarrow
+    
+    Args:
+        pdf_path: Path to the input PDF file, or its bytes or a binary file object
+        output_file: Path to the output file, or a writable binary stream
         sheet_name: Name of the Excel sheet (default: "Sheet1")
+        output_format: 'xlsx', 'csv' or 'parquet' (default: from the output path's
+                       extension, else xlsx)
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-        
-        if not pdf_path.lower().endswith('.pdf'):
-            raise ValueError(f"Not a PDF file: {pdf_path}")
-        
-        # Create output directory if it doesn't exist
-        output_dir = os.path.dirname(output_file)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir, exist_ok=True)
-        
-        # Extract tables from PDF
-        tables = extract_tables_from_pdf(pdf_path)
+        if is_path(pdf_path):
+            if not os.path.exists(pdf_path):
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+            
+            if not source_name(pdf_path).lower().endswith('.pdf'):
+                raise ValueError(f"Not a PDF file: {pdf_path}")
         
-        if not tables:
-            print("Warning: No tables found in PDF. Creating empty Excel file.")
-            # Create empty Excel file
-            df = pd.DataFrame()
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-            return True
+        if output_format is None:
+            ext = os.path.splitext(source_name(output_file))[1].lower().lstrip('.')
+            output_format = ext if ext in OUTPUT_FORMATS else 'xlsx'
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
         
-        # Write to Excel - use first table or merge all tables
-        if len(tables) == 1:
-            # Single table
-            df = pd.DataFrame(tables[0])
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False, header=False)
-        else:
-            # Multiple tables - create multiple sheets
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                for i, table in enumerate(tables):
-                    df = pd.DataFrame(table)
-                    sheet = f"{sheet_name}_{i+1}" if i > 0 else sheet_name
-                    df.to_excel(writer, sheet_name=sheet, index=False, header=False)
+        tables = iter_table_frames(pdf_path)
+        with output_stream(output_file) as output:
+            if output_format == 'csv':
+                count = _write_csv(tables, output)
+            elif output_format == 'parquet':
+                count = _write_parquet(tables, output)
+            else:
+                count = _write_xlsx(tables, output, sheet_name)
         
+        if not count:
+            print("Warning: No tables found in PDF. Created an empty file.")
         return True
         
     except Exception as e:
         print(f"Error converting PDF to Excel: {str(e)}")
         return False
 
+
+def _write_xlsx(tables: Iterable[Tuple[int, pd.DataFrame]], output, sheet_name: str) -> int:
+    """Stream each table into its own sheet; returns the number of tables."""
+    from openpyxl import Workbook
+    
+    # Write-only sheets spool rows to disk instead of building cell objects
+    workbook = Workbook(write_only=True)
+    count = 0
+    for _, frame in tables:
+        count += 1
+        sheet = workbook.create_sheet(f"{sheet_name}_{count}" if count > 1 else sheet_name)
+        for row in frame.itertuples(index=False, name=None):
+            sheet.append(row)
+    if not count:
+        workbook.create_sheet(sheet_name)
+    workbook.save(output)
+    return count
+
+
+def _write_csv(tables: Iterable[Tuple[int, pd.DataFrame]], output) -> int:
+    """Append every table row, prefixed with its page number; returns the number of tables."""
+    count = 0
+    f = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    try:
+        writer = csv.writer(f)
+        for page_number, frame in tables:
+            count += 1
+            writer.writerows((page_number,) + row for row in frame.itertuples(index=False, name=None))
+    finally:
+        # Hand the binary stream back open; its owner closes it
+        f.flush()
+        f.detach()
+    return count
+
+
+def _write_parquet(tables: Iterable[Tuple[int, pd.DataFrame]], output) -> int:
+    """
+    Write tables in long form, one record per non-empty cell.
+    
+    Tables differ in width from page to page, so a fixed
+    (page, row, column, value) schema keeps the file streamable.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+    
+    schema = pa.schema([
+        ('page', pa.int32()),
+        ('row', pa.int32()),
+        ('column', pa.int32()),
+        ('value', pa.string()),
+    ])
+    count = 0
+    buffered = []
+    buffered_cells = 0
+    with pq.ParquetWriter(output, schema) as writer:
+        for page_number, frame in tables:
+            count += 1
+            grid = frame.to_numpy()
+            rows, cols = np.nonzero(grid != '')
+            buffered.append(pa.table({
+                'page': np.full(len(rows), page_number, dtype=np.int32),
+                'row': rows.astype(np.int32),
+                'column': cols.astype(np.int32),
+                'value': pa.array(grid[rows, cols], type=pa.string()),
+            }, schema=schema))
+            buffered_cells += len(rows)
+            if buffered_cells >= PARQUET_ROW_GROUP_CELLS:
+                writer.write_table(pa.concat_tables(buffered))
+                buffered, buffered_cells = [], 0
+        if buffered:
+            writer.write_table(pa.concat_tables(buffered))
+    return count
@@ -3,34 +3,93 @@ PDF to Word Converter - Convert PDF files to Word (.docx) format.
 """
 
 import os
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from docx import Document
 from pypdf import PdfReader
 import re
 
+from .parallel import chunk_ranges, default_workers, ordered_map, process_pool
+from .reporting import report_pages, report_pages_done
+from .streams import Destination, Source, as_stream, is_path, output_stream, portable, source_name
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+# Smaller documents are extracted in-process. With the pool warm a call costs
+# a few ms, against 1.5-15 ms/page of extraction; below ~10 pages two workers
+# do not win that back
+PARALLEL_MIN_PAGES = 16
+
+
+def _extract_page_range(pdf_path: Source, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) in a worker process."""
+    reader = PdfReader(as_stream(pdf_path))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def iter_page_texts(pdf_path: Source, workers: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each page in order.
+    
+    Long documents are split into page ranges that are extracted across a
+    process pool; results are yielded as soon as the next range in order
+    is ready.
+    
+    Args:
+        pdf_path: Path to the PDF file, or its bytes or a binary file object
+        workers: Number of worker processes (default: all cores)
+    """
+    reader = PdfReader(as_stream(pdf_path))
+    total_pages = len(reader.pages)
+    report_pages(total_pages)
+    workers = workers or default_workers()
+    
+    if workers <= 1 or total_pages < PARALLEL_MIN_PAGES:
+        for page in reader.pages:
+            text = page.extract_text() or ""
+            report_pages_done()
+            yield text
+        return
+    
+    # One range per worker: every range re-parses the document in its worker
+    ranges = chunk_ranges(total_pages, workers)
+    pdf_path = portable(pdf_path)
+    results = ordered_map(
+        process_pool(), _extract_page_range, ((pdf_path, start, stop) for start, stop in ranges), workers * 2
+    )
+    for texts in results:
+        report_pages_done(len(texts))
+        yield from texts
+
+
+def extract_text_from_pdf(pdf_path: Source, workers: Optional[int] = None) -> str:
     """
     Extract text content from a PDF file.
     
     Args:
         pdf_path: Path to the PDF file
+        workers: Number of worker processes (default: all cores)
         
     Returns:
         Extracted text as string
     """
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        return "".join(text + "\n" for text in iter_page_texts(pdf_path, workers))
     except Exception as e:
         print(f"Error extracting text from PDF: {str(e)}")
         return ""
 
 
-def pdf_to_word(pdf_path: str, output_file: str) -> bool:
+def _add_paragraphs(doc, paragraphs: List[str]) -> int:
+    """Append non-empty paragraphs to the document, returning how many were added."""
+    added = 0
+    for para_text in paragraphs:
+        if para_text.strip():
+            # Clean up the text
+            para_text = re.sub(r'\s+', ' ', para_text.strip())
+            doc.add_paragraph(para_text)
+            added += 1
+    return added
+
+
+def pdf_to_word(pdf_path: Source, output_file: Destination, workers: Optional[int] = None) -> bool:
     """
     Convert PDF file to Word (.docx) format.
     
@@ -38,44 +97,45 @@ def pdf_to_word(pdf_path: str, output_file: str) -> bool:
     images, and tables, consider using pdf2docx library or other advanced tools.
     
     Args:
-        pdf_path: Path to the input PDF file
-        output_file: Path to the output Word file (.docx)
+        pdf_path: Path to the input PDF file, or its bytes or a binary file object
+        output_file: Path to the output Word file (.docx), or a writable binary stream
+        workers: Number of worker processes for text extraction (default: all cores)
         
     Returns:
         True if successful, False otherwise
     """
     try:
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-        
-        if not pdf_path.lower().endswith('.pdf'):
-            raise ValueError(f"Not a PDF file: {pdf_path}")
+        if is_path(pdf_path):
+            if not os.path.exists(pdf_path):
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+            
+            if not source_name(pdf_path).lower().endswith('.pdf'):
+                raise ValueError(f"Not a PDF file: {pdf_path}")
         
-        # Create output directory if it doesn't exist
-        output_dir = os.path.dirname(output_file)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir, exist_ok=True)
+        # Create Word document
+        doc = Document()
+        added = 0
         
-        # Extract text from PDF
-        text = extract_text_from_pdf(pdf_path)
+        # Paragraphs are separated by blank lines and may span pages. Pages are
+        # joined with a newline, so the leading "\n" lets a blank line that
+        # straddles a page break still split; the unfinished paragraph is kept
+        # as a list of pieces to stay linear on documents without blank lines.
+        tail = []
+        for page_text in iter_page_texts(pdf_path, workers):
+            parts = ("\n" + page_text + "\n").split('\n\n')
+            tail.append(parts[0])
+            if len(parts) > 1:
+                added += _add_paragraphs(doc, ["".join(tail)] + parts[1:-1])
+                tail = [parts[-1]]
+        added += _add_paragraphs(doc, ["".join(tail)])
         
-        if not text.strip():
+        if not added:
             print("Warning: No text could be extracted from the PDF")
             return False
         
-        # Create Word document
-        doc = Document()
-        
-        # Split text into paragraphs (simple approach)
-        paragraphs = text.split('\n\n')
-        for para_text in paragraphs:
-            if para_text.strip():
-                # Clean up the text
-                para_text = re.sub(r'\s+', ' ', para_text.strip())
-                doc.add_paragraph(para_text)
-        
         # Save document
-        doc.save(output_file)
+        with output_stream(output_file) as output:
+            doc.save(output)
         
         return True
         
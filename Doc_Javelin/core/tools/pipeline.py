@@ -0,0 +1,100 @@
+"""
+PDF Pipeline - Run several tools over one document in memory.
+"""
+
+import os
+from typing import List, Optional
+
+from .compress_pdf import COMPRESSION_LEVELS, SAVE_OPTIONS, _recompress_images
+from .parallel import default_workers
+from .pdf_editor import _apply_page_edits
+from .pdf_flattener import _flatten_layers
+from .reporting import report_pages
+from .streams import Destination, Source, is_path, open_document, save_document
+
+# Tools a pipeline step can name
+PIPELINE_TOOLS = ('merge', 'compress', 'edit_pdf', 'flatten')
+
+
+def run_pipeline(input_paths: List[Source], steps: List[dict], output_file: Destination,
+                 workers: Optional[int] = None) -> bool:
+    """
+    Apply a sequence of tools to a PDF, writing only the final result.
+
+    The first input is opened once and every step works on that open
+    document, so nothing is serialized and parsed again between steps.
+
+    Steps are dicts with a 'tool' key and that tool's parameters:
+        {'tool': 'merge'}                           append the other inputs, in order
+        {'tool': 'compress', 'level': 1}            downsample images (see COMPRESSION_LEVELS)
+        {'tool': 'edit_pdf', 'pages_config': [...]} rotate/delete pages, as edit_pdf
+        {'tool': 'flatten', 'layers': [...]}        draw layers, as flatten_pdf_with_layers
+
+    Page numbers in a step refer to the document as the previous step left it.
+
+    Args:
+        input_paths: PDF files (paths, bytes or binary file objects); the first
+                     is the document, the rest are for 'merge'
+        steps: Ordered list of step dicts
+        output_file: Path to the output PDF file, or a writable binary stream
+        workers: Image re-encoding threads for 'compress' (default: all cores)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        if not input_paths:
+            raise ValueError("No input files provided")
+        for file_path in input_paths:
+            if is_path(file_path) and not os.path.exists(file_path):
+                raise FileNotFoundError(f"Input file not found: {file_path}")
+        for step in steps:
+            if step.get('tool') not in PIPELINE_TOOLS:
+                raise ValueError(f"Unknown pipeline tool: {step.get('tool')}")
+        if sum(step['tool'] == 'merge' for step in steps) > 1:
+            raise ValueError("A pipeline can merge only once")
+
+        if is_path(output_file):
+            output_dir = os.path.dirname(output_file)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir, exist_ok=True)
+
+        with open_document(input_paths[0]) as doc:
+            if doc.needs_pass:
+                raise ValueError("Encrypted PDFs are not supported")
+            if not doc.is_pdf:
+                raise ValueError("The first pipeline input is not a PDF")
+            report_pages(doc.page_count)
+
+            compressed = False
+            for step in steps:
+                tool = step['tool']
+                if tool == 'merge':
+                    for path in input_paths[1:]:
+                        with open_document(path) as other:
+                            report_pages(other.page_count)
+                            doc.insert_pdf(other)
+                elif tool == 'compress':
+                    level = int(step.get('level', 1))
+                    if level not in COMPRESSION_LEVELS:
+                        raise ValueError(f"Unknown compression level: {level}")
+                    tier = COMPRESSION_LEVELS[level]
+                    if tier:
+                        _recompress_images(doc, tier['dpi'], tier['quality'], workers or default_workers())
+                    compressed = True
+                elif tool == 'edit_pdf':
+                    pages_config = step.get('pages_config') or []
+                    _apply_page_edits(doc, {int(cfg['pageNum']): cfg for cfg in pages_config})
+                elif tool == 'flatten':
+                    _flatten_layers(doc, step.get('layers') or [])
+
+            # One save at the end; garbage=1 drops what deleted pages used
+            if compressed:
+                save_document(doc, output_file, **SAVE_OPTIONS)
+            else:
+                save_document(doc, output_file, garbage=1)
+        return True
+
+    except Exception as e:
+        print(f"Error running PDF pipeline: {e}")
+        return False
@@ -0,0 +1,62 @@
+"""
+Lets tools report what they handled to a caller that measures them,
+without opening their inputs a second time.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+_pages = contextvars.ContextVar('doc_javelin_pages', default=None)
+_progress = contextvars.ContextVar('doc_javelin_progress', default=None)
+
+
+def report_pages(count: int):
+    """Record that the running tool call handled `count` input pages (or images)."""
+    counter = _pages.get()
+    if counter is not None:
+        counter.append(count)
+    listener = _progress.get()
+    if listener is not None:
+        listener(0, count)
+
+
+def report_pages_done(count: int = 1):
+    """Record that the running tool call finished `count` more of the pages it reported."""
+    listener = _progress.get()
+    if listener is not None:
+        listener(count, 0)
+
+
+@contextmanager
+def counting_pages() -> Iterator[List[int]]:
+    """
+    Collect the page counts reported by tool calls made in this block.
+
+    Yields:
+        The list report_pages() appends to; empty if nothing was reported
+        (the tool failed early, or its work ran in another process)
+    """
+    counter = []
+    token = _pages.set(counter)
+    try:
+        yield counter
+    finally:
+        _pages.reset(token)
+
+
+@contextmanager
+def tracking_progress(listener: Callable[[int, int], None]):
+    """
+    Pass the progress of tool calls made in this block to `listener`.
+
+    listener(done, total) is called with the pages finished and the pages
+    found since its last call. Multi-document tools find pages as they open
+    each input, so the total can grow while a call runs; tools without a
+    page loop report only the total.
+    """
+    token = _progress.set(listener)
+    try:
+        yield
+    finally:
+        _progress.reset(token)
@@ -0,0 +1,175 @@
+"""
+Helpers that let tools read from paths, bytes or file-like objects and
+write to paths or writable streams.
+"""
+
+import io
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Union
+
+import fitz  # PyMuPDF
+from pypdf.generic import IndirectObject
+
+# What a tool accepts as an input document or image
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+# What a tool accepts as its output
+Destination = Union[str, os.PathLike, BinaryIO]
+
+
+def is_path(value) -> bool:
+    return isinstance(value, (str, os.PathLike))
+
+
+def source_name(source: Source) -> str:
+    """A name for messages and extension checks: the path, the file's name, or ''."""
+    if is_path(source):
+        return os.fspath(source)
+    return str(getattr(source, 'name', '') or '')
+
+
+def source_size(source: Source) -> int:
+    """Size in bytes of a source without reading it."""
+    if is_path(source):
+        return os.path.getsize(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).nbytes
+    size = getattr(source, 'size', None)  # Django UploadedFile
+    if size is not None:
+        return size
+    position = source.tell()
+    end = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return end - position
+
+
+def read_bytes(source: Source) -> bytes:
+    """The whole content of a source."""
+    if is_path(source):
+        with open(source, 'rb') as f:
+            return f.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+def as_stream(source: Source):
+    """A path (left as is) or a seekable binary stream, for readers that take either."""
+    if is_path(source):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def portable(source: Source):
+    """A form of the source that can be sent to a worker process."""
+    if is_path(source) or isinstance(source, bytes):
+        return source
+    return read_bytes(source)
+
+
+def open_document(source: Source) -> fitz.Document:
+    """Open a PDF with PyMuPDF from any kind of source."""
+    if is_path(source):
+        return fitz.open(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype='pdf')
+    return fitz.open(stream=read_bytes(source), filetype='pdf')
+
+
+def save_document(doc: fitz.Document, destination: Destination, **options):
+    """Save a PyMuPDF document to a path or writable stream."""
+    if is_path(destination):
+        doc.save(destination, **options)
+    else:
+        # PyMuPDF only writes reliably to real files and BytesIO
+        destination.write(doc.tobytes(**options))
+
+
+@contextmanager
+def output_stream(destination: Destination):
+    """
+    Yield a writable binary stream for the destination.
+
+    Paths are opened (creating the directory) and closed afterwards, and a
+    partly written file is removed if the block raises; streams are passed
+    through and left open.
+    """
+    if not is_path(destination):
+        yield destination
+        return
+
+    output_dir = os.path.dirname(destination)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    try:
+        with open(destination, 'wb') as f:
+            yield f
+    except BaseException:
+        try: os.remove(destination)
+        except OSError: pass
+        raise
+
+
+class StreamingPdfWriter:
+    """
+    Minimal PDF serializer that writes objects as soon as they are ready.
+
+    Objects are numbered with reserve() and written with write() in any
+    order; close() adds the cross-reference table and trailer. Only the
+    offsets are kept, so memory does not grow with the size of the output,
+    and the stream never needs to seek.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.offsets = []
+        self.position = 0
+        self._emit(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def _emit(self, data: bytes):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def reserve(self) -> IndirectObject:
+        """Allocate the next object number."""
+        self.offsets.append(None)
+        return IndirectObject(len(self.offsets), 0, None)
+
+    def write(self, ref: IndirectObject, obj):
+        self.offsets[ref.idnum - 1] = self.position
+        self._emit(f"{ref.idnum} 0 obj\n".encode())
+        buf = _CountingStream(self.stream)
+        obj.write_to_stream(buf)
+        self.position += buf.written
+        self._emit(b"\nendobj\n")
+
+    def close(self, root: IndirectObject):
+        xref_offset = self.position
+        lines = [f"xref\n0 {len(self.offsets) + 1}\n", "0000000000 65535 f \n"]
+        for offset in self.offsets:
+            # Reserved numbers that never got written are emitted as free entries
+            if offset is None:
+                lines.append("0000000000 65535 f \n")
+            else:
+                lines.append(f"{offset:010d} 00000 n \n")
+        self._emit("".join(lines).encode())
+        self._emit(
+            f"trailer\n<< /Size {len(self.offsets) + 1} /Root {root.idnum} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+
+
+class _CountingStream:
+    """Write-through wrapper that counts bytes, so non-seekable outputs work."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.written = 0
+
+    def write(self, data: bytes):
+        self.stream.write(data)
+        self.written += len(data)
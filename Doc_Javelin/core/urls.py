@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Pages - Redirect to Editor
@@ -13,20 +13,32 @@ urlpatterns = [
     path('result/<int:task_id>', views.page_result, name='result_page'),
 
     # APIs
-    path('api/merge', views.merge_pdfs_view, name='merge_pdfs_api'),
-    path('api/img2pdf', views.img2pdf_view, name='img2pdf_api'),
-    path('api/pdf2word', views.pdf2word_view, name='pdf2word_api'),
-    path('api/pdf2excel', views.pdf2excel_view, name='pdf2excel_api'),
-    path('api/edit-pdf', views.edit_pdf_view, name='edit_pdf_api'),
-    path('api/compress', views.compress_pdf_view, name='compress_pdf_api'),
+    path('api/merge', async_views.merge_pdfs_view, name='merge_pdfs_api'),
+    path('api/img2pdf', async_views.img2pdf_view, name='img2pdf_api'),
+    path('api/pdf2word', async_views.pdf2word_view, name='pdf2word_api'),
+    path('api/pdf2excel', async_views.pdf2excel_view, name='pdf2excel_api'),
+    path('api/edit-pdf', async_views.edit_pdf_view, name='edit_pdf_api'),
+    path('api/compress', async_views.compress_pdf_view, name='compress_pdf_api'),
+    path('api/batch/<str:tool>', async_views.api_batch, name='api_batch'),
+    path('api/tasks/<int:task_id>', views.api_task_status, name='api_task_status'),
 
     # Editor Studio
-    path('api/upload-session', views.api_upload_session, name='api_upload_session'),
-    path('api/process-session/<str:tool>/<str:session_id>', views.api_process_session, name='api_process_session'),
-    path('api/editor/apply/<str:session_id>', views.api_editor_apply, name='api_editor_apply'),
-    path('api/analyze-pdf/<str:session_id>/<int:page_num>', views.api_analyze_pdf, name='api_analyze_pdf'),
+    path('api/upload-session', async_views.api_upload_session, name='api_upload_session'),
+    path('api/upload-session/init', async_views.api_upload_init, name='api_upload_init'),
+    path('api/upload-session/<str:session_id>/<str:upload_id>', async_views.api_upload_chunk, name='api_upload_chunk'),
+    path('api/upload-session/<str:session_id>/<str:upload_id>/complete', async_views.api_upload_complete, name='api_upload_complete'),
+    path('api/process-session/<str:tool>/<str:session_id>', async_views.api_process_session, name='api_process_session'),
+    path('api/editor/apply/<str:session_id>', async_views.api_editor_apply, name='api_editor_apply'),
+    path('api/pipeline/<str:session_id>', async_views.api_pipeline, name='api_pipeline'),
+    path('api/analyze-pdf/<str:session_id>/<int:page_num>', async_views.api_analyze_pdf, name='api_analyze_pdf'),
+    path('api/analyze-pdf/<str:session_id>', async_views.api_analyze_document, name='api_analyze_document'),
+    path('api/thumbnail/<str:session_id>/<int:page_num>', async_views.api_page_thumbnail, name='api_page_thumbnail'),
+    path('api/thumbnails/<str:session_id>', async_views.api_document_thumbnails, name='api_document_thumbnails'),
     path('editor/<str:tool>/<str:session_id>', views.editor_view, name='editor_view'),
 
+    # Monitoring
+    path('metrics', views.metrics_view, name='metrics'),
+
     # Downloads
     path('download/<path:filename>', views.download_redirect, name='download_file'),
 ]
@@ -1,5 +1,5 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage
 from django.core.files.base import ContentFile
@@ -8,6 +8,8 @@ from django.utils.decorators import method_decorator
 import os
 import uuid
 import shutil
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 import json
 
@@ -17,11 +19,35 @@ try:
     from core.tools import (
         merge_pdfs,
         img_to_pdf,
+        img_to_pdfs,
         pdf_to_word,
         pdf_to_excel,
         edit_pdf,
-        compress_pdf
+        compress_pdf,
+        compress_pdf_report,
+        run_pipeline,
+        iter_batch
     )
+    from core.tools.compress_pdf import COMPRESSION_LEVELS
+    from core.tools.pdf_flattener import flatten_pdf_with_layers
+    from core.tools.pdf_analyzer import analyze_pdf_text, iter_page_analyses, ANALYSIS_CACHE_VERSION
+    from core.tools.pdf_thumbnails import render_thumbnail, iter_thumbnails, THUMBNAIL_CACHE_VERSION
+    from core.jobs import submit_job, queue_position
+    from core import blobstore, metrics, sweeper
+
+    # Every tool call made from these views (inline or as a job) is measured
+    merge_pdfs = metrics.instrument('merge_pdfs', merge_pdfs)
+    img_to_pdf = metrics.instrument('img_to_pdf', img_to_pdf)
+    img_to_pdfs = metrics.instrument('img_to_pdfs', img_to_pdfs)
+    pdf_to_word = metrics.instrument('pdf_to_word', pdf_to_word)
+    pdf_to_excel = metrics.instrument('pdf_to_excel', pdf_to_excel)
+    edit_pdf = metrics.instrument('edit_pdf', edit_pdf)
+    compress_pdf = metrics.instrument('compress_pdf', compress_pdf)
+    compress_pdf_report = metrics.instrument('compress_pdf', compress_pdf_report)
+    flatten_pdf_with_layers = metrics.instrument('flatten_pdf', flatten_pdf_with_layers, output_arg=2)
+    run_pipeline = metrics.instrument('pipeline', run_pipeline)
+    analyze_pdf_text = metrics.instrument('analyze_pdf', analyze_pdf_text, output_arg=None)
+    render_thumbnail = metrics.instrument('render_thumbnail', render_thumbnail, output_arg=None)
 except ImportError:
     # Fallback for dev if models/tools aren't perfectly synced yet
     pass
@@ -60,7 +86,8 @@ def page_result(request, task_id):
             'pdf2word': 'pdf2word_page',
             'pdf2excel': 'pdf2excel_page',
             'edit_pdf': 'edit_pdf_page',
-            'compress': 'compress_page'
+            'compress': 'compress_page',
+            'pipeline': 'edit_pdf_page'
         }
         
         # Get readable task name
@@ -71,6 +98,7 @@ def page_result(request, task_id):
             'pdf2excel': 'PDF to Excel',
             'edit_pdf': 'Edit PDF',
             'compress': 'Compress PDF',
+            'pipeline': 'PDF Pipeline',
         }
         
         restart_url = '/' + task.task_type # default fallback
@@ -97,11 +125,87 @@ def save_uploaded_file(uploaded_file):
     os.makedirs(temp_dir, exist_ok=True)
     filename = f"{uuid.uuid4()}_{uploaded_file.name}"
     file_path = os.path.join(temp_dir, filename)
-    with open(file_path, 'wb+') as destination:
-        for chunk in uploaded_file.chunks():
-            destination.write(chunk)
+    with metrics.phase('file_save'):
+        blobstore.save_chunks(uploaded_file.chunks(), file_path)
     return file_path
 
+def _upload_source(uploaded_file):
+    """
+    The upload as a tool input, without copying it: the temporary file Django
+    spooled a large upload to, or the in-memory upload itself.
+    """
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        return uploaded_file.temporary_file_path()
+    return uploaded_file
+
+def _download_mode(request):
+    """Whether the client asked for the result in the response body (download=true) rather than a stored output."""
+    return (request.GET.get('download') or request.POST.get('download')) == 'true'
+
+def _output_buffer():
+    """A stream for a tool's output that stays in memory up to IN_MEMORY_OUTPUT_BYTES."""
+    return tempfile.SpooledTemporaryFile(max_size=settings.IN_MEMORY_OUTPUT_BYTES)
+
+def _download_response(buffer, filename):
+    buffer.seek(0)
+    return FileResponse(buffer, as_attachment=True, filename=filename)
+
+def _job_mode(request, data=None):
+    """Whether the client asked for the tool to run as a background job (mode=job)."""
+    mode = request.GET.get('mode') or request.POST.get('mode')
+    if not mode and isinstance(data, dict):
+        mode = data.get('mode')
+    return mode == 'job'
+
+def _compact_option(value):
+    """Parse the optional 'compact' flag: True/False when given, None to let the tool decide."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def _compression_level(value):
+    """Parse a compression level (default 1), or None if it is not one of COMPRESSION_LEVELS."""
+    if value is None or value == '':
+        return 1
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        return None
+    return level if level in COMPRESSION_LEVELS else None
+
+def _invalid_level_response():
+    return JsonResponse({'error': f'level must be one of {sorted(COMPRESSION_LEVELS)}'}, status=400)
+
+def _start_job(task_type, original_names, func, args, output_file, cleanup=()):
+    """Create a pending DocumentTask and hand the tool call to the worker pool."""
+    from django.urls import reverse
+    from django.utils import timezone
+
+    task = DocumentTask.objects.create(
+        task_type=task_type,
+        status='pending',
+        original_filenames=','.join(original_names),
+        heartbeat_at=timezone.now()
+    )
+    if not submit_job(task.id, func, args, output_file=output_file, cleanup=cleanup):
+        for p in cleanup:
+            try: os.remove(p)
+            except: pass
+        task.status = 'failed'
+        task.error_message = 'Server busy'
+        task.finished_at = timezone.now()
+        task.save()
+        return JsonResponse({'error': 'Server busy, please try again shortly'}, status=503)
+
+    return JsonResponse({
+        'success': True,
+        'task_id': task.id,
+        'status': task.status,
+        'status_url': reverse('api_task_status', args=[task.id])
+    }, status=202)
+
 # --- API VIEWS ---
 
 def merge_pdfs_view(request):
@@ -113,23 +217,25 @@ def merge_pdfs_view(request):
         if not files:
             return JsonResponse({'error': 'No files provided'}, status=400)
             
-        input_paths = []
-        original_names = []
-        for f in files:
-            path = save_uploaded_file(f)
-            input_paths.append(path)
-            original_names.append(f.name)
+        original_names = [f.name for f in files]
+        if _download_mode(request):
+            buffer = _output_buffer()
+            if not merge_pdfs([_upload_source(f) for f in files], buffer):
+                return JsonResponse({'error': 'Failed to merge PDFs'}, status=500)
+            return _download_response(buffer, 'merged.pdf')
             
         output_filename = f"merged_{uuid.uuid4()}.pdf"
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, output_filename)
         
-        success = merge_pdfs(input_paths, output_path)
+        if _job_mode(request):
+            # Jobs outlive the request, so their inputs need a copy on disk
+            input_paths = [save_uploaded_file(f) for f in files]
+            return _start_job('merge', original_names, merge_pdfs, (input_paths, output_path),
+                              f"outputs/{output_filename}", cleanup=input_paths)
         
-        for p in input_paths:
-            try: os.remove(p)
-            except: pass
+        success = merge_pdfs([_upload_source(f) for f in files], output_path)
                 
         if success:
             task = DocumentTask.objects.create(
@@ -161,37 +267,34 @@ def img2pdf_view(request):
         if not files:
             return JsonResponse({'error': 'No files provided'}, status=400)
             
-        input_paths = []
-        original_names = []
-        for f in files:
-            path = save_uploaded_file(f)
-            input_paths.append(path)
-            original_names.append(f.name)
+        original_names = [f.name for f in files]
+        sources = [_upload_source(f) for f in files]
+        if _download_mode(request) and not separate:
+            buffer = _output_buffer()
+            if not img_to_pdf(sources, buffer, single_pdf_per_image=False):
+                return JsonResponse({'error': 'Failed to convert images'}, status=500)
+            return _download_response(buffer, 'images.pdf')
             
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
         os.makedirs(output_dir, exist_ok=True)
         
         if separate:
+            out_names = [f"{os.path.splitext(f.name)[0]}_{uuid.uuid4()}.pdf" for f in files]
+            # Each image becomes its own PDF, converted concurrently
+            results = img_to_pdfs(sources, [os.path.join(output_dir, n) for n in out_names])
+            
             output_files = []
             success_count = 0
-            for i, input_path in enumerate(input_paths):
-                base_name = os.path.splitext(files[i].name)[0]
-                out_name = f"{base_name}_{uuid.uuid4()}.pdf"
-                out_path = os.path.join(output_dir, out_name)
-                
-                if img_to_pdf([input_path], out_path, single_pdf_per_image=False):
+            for f, out_name, ok in zip(files, out_names, results):
+                if ok:
                     task = DocumentTask.objects.create(
                         task_type='img2pdf',
                         status='success',
-                        original_filenames=files[i].name,
+                        original_filenames=f.name,
                         output_file=f"outputs/{out_name}"
                     )
                     output_files.append(out_name)
                     success_count += 1
-            
-            for p in input_paths:
-                try: os.remove(p)
-                except: pass
                 
             return JsonResponse({
                 'success': True,
@@ -202,11 +305,12 @@ def img2pdf_view(request):
             output_filename = f"images_{uuid.uuid4()}.pdf"
             output_path = os.path.join(output_dir, output_filename)
             
-            success = img_to_pdf(input_paths, output_path, single_pdf_per_image=False)
+            if _job_mode(request):
+                input_paths = [save_uploaded_file(f) for f in files]
+                return _start_job('img2pdf', original_names, img_to_pdf, (input_paths, output_path, False),
+                                  f"outputs/{output_filename}", cleanup=input_paths)
             
-            for p in input_paths:
-                try: os.remove(p)
-                except: pass
+            success = img_to_pdf(sources, output_path, single_pdf_per_image=False)
                 
             if success:
                 task = DocumentTask.objects.create(
@@ -234,15 +338,22 @@ def pdf2word_view(request):
         if 'file' not in request.FILES:
             return JsonResponse({'error': 'No file provided'}, status=400)
         f = request.FILES['file']
-        input_path = save_uploaded_file(f)
+        if _download_mode(request):
+            buffer = _output_buffer()
+            if not pdf_to_word(_upload_source(f), buffer):
+                return JsonResponse({'error': 'Failed to convert'}, status=500)
+            return _download_response(buffer, f"{os.path.splitext(f.name)[0]}.docx")
         output_filename = f"{os.path.splitext(f.name)[0]}_{uuid.uuid4()}.docx"
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, output_filename)
         
-        success = pdf_to_word(input_path, output_path)
-        try: os.remove(input_path)
-        except: pass
+        if _job_mode(request):
+            input_path = save_uploaded_file(f)
+            return _start_job('pdf2word', [f.name], pdf_to_word, (input_path, output_path),
+                              f"outputs/{output_filename}", cleanup=[input_path])
+        
+        success = pdf_to_word(_upload_source(f), output_path)
         
         if success:
             task = DocumentTask.objects.create(
@@ -270,15 +381,26 @@ def pdf2excel_view(request):
         if 'file' not in request.FILES:
             return JsonResponse({'error': 'No file provided'}, status=400)
         f = request.FILES['file']
-        input_path = save_uploaded_file(f)
-        output_filename = f"{os.path.splitext(f.name)[0]}_{uuid.uuid4()}.xlsx"
+        # xlsx (default), csv or parquet
+        output_format = request.POST.get('format', 'xlsx')
+        if output_format not in ('xlsx', 'csv', 'parquet'):
+            return JsonResponse({'error': 'Unsupported output format'}, status=400)
+        if _download_mode(request):
+            buffer = _output_buffer()
+            if not pdf_to_excel(_upload_source(f), buffer, output_format=output_format):
+                return JsonResponse({'error': 'Failed to convert'}, status=500)
+            return _download_response(buffer, f"{os.path.splitext(f.name)[0]}.{output_format}")
+        output_filename = f"{os.path.splitext(f.name)[0]}_{uuid.uuid4()}.{output_format}"
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, output_filename)
         
-        success = pdf_to_excel(input_path, output_path)
-        try: os.remove(input_path)
-        except: pass
+        if _job_mode(request):
+            input_path = save_uploaded_file(f)
+            return _start_job('pdf2excel', [f.name], pdf_to_excel, (input_path, output_path),
+                              f"outputs/{output_filename}", cleanup=[input_path])
+        
+        success = pdf_to_excel(_upload_source(f), output_path)
         
         if success:
             task = DocumentTask.objects.create(
@@ -311,15 +433,23 @@ def edit_pdf_view(request):
             pages_config = json.loads(pages_config_str)
         except:
             return JsonResponse({'error': 'Invalid pages configuration'}, status=400)
-        input_path = save_uploaded_file(f)
+        compact = _compact_option(request.POST.get('compact'))
+        if _download_mode(request):
+            buffer = _output_buffer()
+            if not edit_pdf(_upload_source(f), buffer, pages_config, compact):
+                return JsonResponse({'error': 'Failed to edit PDF'}, status=500)
+            return _download_response(buffer, f"edited_{os.path.basename(f.name)}")
         output_filename = f"edited_{os.path.splitext(f.name)[0]}_{uuid.uuid4()}.pdf"
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, output_filename)
         
-        success = edit_pdf(input_path, output_path, pages_config)
-        try: os.remove(input_path)
-        except: pass
+        if _job_mode(request):
+            input_path = save_uploaded_file(f)
+            return _start_job('edit_pdf', [f.name], edit_pdf, (input_path, output_path, pages_config, compact),
+                              f"outputs/{output_filename}", cleanup=[input_path])
+        
+        success = edit_pdf(_upload_source(f), output_path, pages_config, compact)
         
         if success:
              task = DocumentTask.objects.create(
@@ -347,17 +477,27 @@ def compress_pdf_view(request):
         if 'file' not in request.FILES:
             return JsonResponse({'error': 'No file provided'}, status=400)
         f = request.FILES['file']
-        input_path = save_uploaded_file(f)
+        level = _compression_level(request.POST.get('level'))
+        if level is None:
+            return _invalid_level_response()
+        if _download_mode(request):
+            buffer = _output_buffer()
+            if not compress_pdf_report(_upload_source(f), buffer, level):
+                return JsonResponse({'error': 'Failed to compress PDF'}, status=500)
+            return _download_response(buffer, f"compressed_{os.path.basename(f.name)}")
         output_filename = f"compressed_{os.path.splitext(f.name)[0]}_{uuid.uuid4()}.pdf"
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, output_filename)
         
-        success = compress_pdf(input_path, output_path)
-        try: os.remove(input_path)
-        except: pass
+        if _job_mode(request):
+            input_path = save_uploaded_file(f)
+            return _start_job('compress', [f.name], compress_pdf, (input_path, output_path, level),
+                              f"outputs/{output_filename}", cleanup=[input_path])
         
-        if success:
+        report = compress_pdf_report(_upload_source(f), output_path, level)
+        
+        if report:
             task = DocumentTask.objects.create(
                 task_type='compress',
                 status='success',
@@ -369,13 +509,99 @@ def compress_pdf_view(request):
                 'message': 'Successfully compressed PDF',
                 'filename': output_filename,
                 'url': task.output_file.url,
-                'task_id': task.id
+                'task_id': task.id,
+                'report': report
             })
         else:
             return JsonResponse({'error': 'Failed to compress PDF'}, status=500)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def api_batch(request, tool):
+    """
+    Run one tool over many PDFs and stream the results back as a ZIP.
+    Expects POST with files[] and the tool's options (format, level,
+    pages_config, compact). Files are converted concurrently and each is
+    added to the archive as soon as it is done; any that fail are listed
+    in errors.txt at the end.
+    """
+    from django.http import StreamingHttpResponse
+    from core.file_serving import iter_zip
+    from core.tools.batch import BATCH_TOOLS, batch_extension
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    if tool not in BATCH_TOOLS:
+        return JsonResponse({'error': f'Unknown batch tool: {tool}'}, status=404)
+    try:
+        files = request.FILES.getlist('files[]')
+        if not files:
+            return JsonResponse({'error': 'No files provided'}, status=400)
+        if len(files) > settings.BATCH_MAX_FILES:
+            return JsonResponse({'error': f'At most {settings.BATCH_MAX_FILES} files per batch'}, status=400)
+
+        options = {}
+        if tool == 'pdf2excel':
+            options['format'] = request.POST.get('format', 'xlsx')
+            if options['format'] not in ('xlsx', 'csv', 'parquet'):
+                return JsonResponse({'error': 'Unsupported output format'}, status=400)
+        elif tool == 'compress':
+            options['level'] = _compression_level(request.POST.get('level'))
+            if options['level'] is None:
+                return _invalid_level_response()
+        elif tool == 'edit_pdf':
+            try:
+                options['pages_config'] = json.loads(request.POST.get('pages_config', '[]'))
+            except ValueError:
+                return JsonResponse({'error': 'Invalid pages configuration'}, status=400)
+            options['compact'] = _compact_option(request.POST.get('compact'))
+
+        ext = batch_extension(tool, options)
+        prefix = {'compress': 'compressed_', 'edit_pdf': 'edited_'}.get(tool, '')
+        temp_dir = os.path.join(settings.MEDIA_ROOT, 'temp')
+        os.makedirs(temp_dir, exist_ok=True)
+        batch_id = uuid.uuid4()
+        output_paths = [os.path.join(temp_dir, f"{batch_id}_{i}.{ext}") for i in range(len(files))]
+        names = _unique_names([f"{prefix}{os.path.splitext(os.path.basename(f.name))[0]}.{ext}" for f in files])
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+    def entries():
+        failed = []
+        try:
+            for index, ok in iter_batch(tool, [_upload_source(f) for f in files], output_paths, options):
+                if not ok:
+                    failed.append(files[index].name)
+                    continue
+                yield names[index], output_paths[index]
+                os.remove(output_paths[index])
+            if failed:
+                yield 'errors.txt', ('Could not convert:\n' + ''.join(f"{name}\n" for name in failed)).encode()
+        finally:
+            for p in output_paths:
+                try: os.remove(p)
+                except OSError: pass
+
+    response = StreamingHttpResponse(iter_zip(entries()), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{tool}_batch.zip"'
+    # Let proxies pass entries through as they are produced
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _unique_names(names):
+    """Make archive names unique by numbering repeats: a.pdf, a_2.pdf, ..."""
+    seen = set()
+    unique = []
+    for name in names:
+        base, ext = os.path.splitext(name)
+        candidate, n = name, 2
+        while candidate in seen:
+            candidate = f"{base}_{n}{ext}"
+            n += 1
+        seen.add(candidate)
+        unique.append(candidate)
+    return unique
+
 # --- EDITOR STUDIO VIEWS ---
 
 def api_upload_session(request):
@@ -397,9 +623,8 @@ def api_upload_session(request):
         for f in files:
             clean_name = os.path.basename(f.name)
             file_path = os.path.join(session_dir, clean_name)
-            with open(file_path, 'wb+') as dest:
-                for chunk in f.chunks():
-                    dest.write(chunk)
+            with metrics.phase('file_save'):
+                blobstore.save_chunks(f.chunks(), file_path)
             file_info.append({
                 'name': clean_name,
                 'size': f.size,
@@ -413,6 +638,175 @@ def api_upload_session(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def _partial_paths(session_id, upload_id):
+    """Paths of the partial file and its metadata for a chunked upload, or None if the ids are invalid."""
+    try:
+        upload_id = uuid.UUID(upload_id).hex
+    except ValueError:
+        return None
+    if not session_id or os.path.basename(session_id) != session_id or session_id.startswith('.'):
+        return None
+    partial_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id, '.partial')
+    return (os.path.join(partial_dir, f"{upload_id}.part"),
+            os.path.join(partial_dir, f"{upload_id}.json"))
+
+@contextmanager
+def _upload_lock(part_file):
+    """Hold an exclusive lock on an open partial upload; a no-op without fcntl."""
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    if fcntl is not None:
+        fcntl.flock(part_file, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(part_file, fcntl.LOCK_UN)
+
+def _upload_state(part_path, meta):
+    received = os.path.getsize(part_path)
+    return {
+        'success': True,
+        'upload_id': meta['upload_id'],
+        'session_id': meta['session_id'],
+        'name': meta['name'],
+        'size': meta['size'],
+        'received': received,
+        'ranges': [[0, received]] if received else [],
+        'chunk_size': settings.UPLOAD_CHUNK_SIZE,
+    }
+
+def api_upload_init(request):
+    """
+    Start a resumable upload into an Editor Studio session.
+    Expects POST with JSON body: { name, size, session_id? }
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    try:
+        data = json.loads(request.body)
+        clean_name = os.path.basename(data.get('name', ''))
+        size = int(data.get('size', -1))
+        if not clean_name or clean_name.startswith('.'):
+            return JsonResponse({'error': 'Invalid file name'}, status=400)
+        if size < 0 or size > settings.UPLOAD_MAX_SIZE:
+            return JsonResponse({'error': 'Invalid file size'}, status=400)
+
+        session_id = data.get('session_id') or str(uuid.uuid4())
+        upload_id = uuid.uuid4().hex
+        paths = _partial_paths(session_id, upload_id)
+        if paths is None:
+            return JsonResponse({'error': 'Invalid session'}, status=400)
+        part_path, meta_path = paths
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+
+        meta = {'upload_id': upload_id, 'session_id': session_id, 'name': clean_name, 'size': size}
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+        open(part_path, 'wb').close()
+        return JsonResponse(_upload_state(part_path, meta))
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+def api_upload_chunk(request, session_id, upload_id):
+    """
+    GET reports the byte ranges received so far.
+    PUT/POST writes the raw request body at ?offset=N (default: end of the received data).
+    """
+    paths = _partial_paths(session_id, upload_id)
+    if paths is None or not os.path.exists(paths[1]):
+        return JsonResponse({'error': 'Upload not found'}, status=404)
+    part_path, meta_path = paths
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        if request.method == 'GET':
+            return JsonResponse(_upload_state(part_path, meta))
+        if request.method not in ('PUT', 'POST'):
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+        if not request.META.get('CONTENT_LENGTH'):
+            return JsonResponse({'error': 'Content-Length required'}, status=411)
+        length = int(request.META['CONTENT_LENGTH'])
+
+        # Chunks of one upload sent in parallel are written one at a time, so
+        # the offset check and the write see the same file
+        with open(part_path, 'r+b') as dest, _upload_lock(dest):
+            if not os.path.exists(meta_path):
+                # Completed while this chunk waited for the lock
+                return JsonResponse({'error': 'Upload not found'}, status=404)
+            received = os.fstat(dest.fileno()).st_size
+            offset = int(request.GET.get('offset', received))
+            # Chunks may be re-sent, but not leave a gap after what we already have
+            if offset < 0 or offset > received:
+                state = _upload_state(part_path, meta)
+                state.update(success=False, error='Offset does not match received data')
+                return JsonResponse(state, status=409)
+            if offset + length > meta['size']:
+                return JsonResponse({'error': 'Chunk exceeds declared file size'}, status=400)
+
+            # Copy the body straight to disk; request.read streams from the socket
+            with metrics.phase('upload'):
+                dest.seek(offset)
+                remaining = length
+                while remaining > 0:
+                    chunk = request.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    remaining -= len(chunk)
+        # Writes under .partial/ do not update the session directory's mtime
+        sweeper.touch(os.path.dirname(os.path.dirname(part_path)))
+        return JsonResponse(_upload_state(part_path, meta))
+    except FileNotFoundError:
+        # Completed (or swept) since the check above
+        return JsonResponse({'error': 'Upload not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+def api_upload_complete(request, session_id, upload_id):
+    """Finish a resumable upload and add the file to its session."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    paths = _partial_paths(session_id, upload_id)
+    if paths is None or not os.path.exists(paths[1]):
+        return JsonResponse({'error': 'Upload not found'}, status=404)
+    part_path, meta_path = paths
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        # Wait for chunks still being written, and keep late ones out
+        with open(part_path, 'rb') as part, _upload_lock(part):
+            if not os.path.exists(meta_path):
+                return JsonResponse({'error': 'Upload not found'}, status=404)
+            if os.fstat(part.fileno()).st_size != meta['size']:
+                state = _upload_state(part_path, meta)
+                state.update(success=False, error='Upload incomplete')
+                return JsonResponse(state, status=409)
+
+            session_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id)
+            file_path = os.path.join(session_dir, meta['name'])
+            with metrics.phase('file_save'):
+                blobstore.save_file(part_path, file_path)
+            os.remove(meta_path)
+
+        return JsonResponse({
+            'success': True,
+            'session_id': session_id,
+            'files': [{
+                'name': meta['name'],
+                'size': meta['size'],
+                'url': f"{settings.MEDIA_URL}sessions/{session_id}/{meta['name']}"
+            }]
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
 def editor_view(request, tool, session_id):
     """Render the unified editor studio."""
     session_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id)
@@ -423,14 +817,14 @@ def editor_view(request, tool, session_id):
     }
     
     if os.path.exists(session_dir):
-        for fname in os.listdir(session_dir):
-            fpath = os.path.join(session_dir, fname)
-            if os.path.isfile(fpath):
-                ctx['initial_files'].append({
-                    'name': fname,
-                    'size': os.path.getsize(fpath),
-                    'url': f"{settings.MEDIA_URL}sessions/{session_id}/{fname}"
-                })
+        sweeper.touch(session_dir)
+        # Listed in the order the session endpoints use
+        for fname in _session_files(session_dir):
+            ctx['initial_files'].append({
+                'name': fname,
+                'size': os.path.getsize(os.path.join(session_dir, fname)),
+                'url': f"{settings.MEDIA_URL}sessions/{session_id}/{fname}"
+            })
     return render(request, 'core/editor.html', ctx)
 
 from django.views.decorators.clickjacking import xframe_options_sameorigin
@@ -438,25 +832,30 @@ from django.views.decorators.clickjacking import xframe_options_sameorigin
 @xframe_options_sameorigin
 def download_redirect(request, filename):
     """Serve file with optional renaming."""
-    from django.http import FileResponse
     import mimetypes
+    from core.file_serving import serve_file
     
     filename = os.path.basename(filename)
     output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
     file_path = os.path.join(output_dir, filename)
     
     if not os.path.exists(file_path):
-        # Fuzzy search
-        found = False
-        if len(filename) > 20: 
-             for f in os.listdir(output_dir):
-                 if filename in f:
-                     file_path = os.path.join(output_dir, f)
-                     filename = f # Update real filename
-                     found = True
-                     break
-        if not found:
+        # Names may arrive truncated or without extension; look the task up by
+        # the uuid embedded in every output name instead of scanning outputs/.
+        # A name cut off inside the uuid is matched by the part that is left
+        # (at least its first 8 characters); one cut off before that is not found.
+        token = DocumentTask.token_for(filename)
+        prefix = '' if token else DocumentTask.token_prefix_for(filename)
+        task = None
+        if token:
+            task = DocumentTask.objects.filter(output_token=token).exclude(output_file='').first()
+        elif prefix:
+            candidates = DocumentTask.objects.filter(output_token__startswith=prefix).exclude(output_file='')
+            task = next((t for t in candidates[:20] if filename in os.path.basename(t.output_file.name)), None)
+        if task is None or not os.path.isfile(task.output_file.path):
             return HttpResponse('File not found', status=404)
+        file_path = task.output_file.path
+        filename = os.path.basename(file_path) # Update real filename
 
     # Determine Correct Extension
     _, real_ext = os.path.splitext(filename)
@@ -480,10 +879,9 @@ def download_redirect(request, filename):
         content_type, _ = mimetypes.guess_type(file_path)
         if not content_type: content_type = 'application/octet-stream'
 
-    response = FileResponse(open(file_path, 'rb'), content_type=content_type)
     disposition = 'inline' if request.GET.get('preview') == 'true' else 'attachment'
-    response['Content-Disposition'] = f'{disposition}; filename="{custom_name}"'
-    return response
+    sweeper.touch(file_path)
+    return serve_file(request, file_path, content_type, f'{disposition}; filename="{custom_name}"')
 
 def editor_entry_view(request, tool):
     """EntryPoint for tools to land directly on the editor."""
@@ -500,11 +898,14 @@ def api_process_session(request, tool, session_id):
         session_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id)
         if not os.path.exists(session_dir):
             return JsonResponse({'error': 'Session expired or invalid'}, status=404)
+        sweeper.touch(session_dir)
 
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
         os.makedirs(output_dir, exist_ok=True)
         task_output_file = None
         task_original_names = []
+        tool_func = None
+        tool_args = ()
 
         if tool == 'merge':
             # Expect data['files'] as ordered list of filenames
@@ -519,89 +920,85 @@ def api_process_session(request, tool, session_id):
                          task_original_names.append(fname)
             else:
                 # Fallback: all files
-                for fname in os.listdir(session_dir):
-                    fpath = os.path.join(session_dir, fname)
-                    if os.path.isfile(fpath):
-                        input_paths.append(fpath)
-                        task_original_names.append(fname)
+                for fname in _session_files(session_dir):
+                    input_paths.append(os.path.join(session_dir, fname))
+                    task_original_names.append(fname)
 
             if not input_paths:
                  return JsonResponse({'error': 'No files to merge'}, status=400)
 
             out_name = f"merged_{uuid.uuid4()}.pdf"
-            out_path = os.path.join(output_dir, out_name)
-            
-            success = merge_pdfs(input_paths, out_path)
-            if success:
-                task_output_file = f"outputs/{out_name}"
+            tool_func = merge_pdfs
+            tool_args = (input_paths, os.path.join(output_dir, out_name))
 
         elif tool == 'compress':
-            files = [f for f in os.listdir(session_dir) if os.path.isfile(os.path.join(session_dir, f))]
-            if not files: return JsonResponse({'error': 'No file'}, status=400)
+            files = _session_files(session_dir, pdf_only=True)
+            if not files: return JsonResponse({'error': 'No PDF found in session'}, status=400)
             
+            level = _compression_level(data.get('level'))
+            if level is None:
+                return _invalid_level_response()
             fname = files[0] # Compress first file only for now
             input_path = os.path.join(session_dir, fname)
             out_name = f"compressed_{uuid.uuid4()}.pdf"
-            out_path = os.path.join(output_dir, out_name)
-            
-            success = compress_pdf(input_path, out_path)
-            if success:
-                 task_output_file = f"outputs/{out_name}"
-                 task_original_names.append(fname)
+            task_original_names.append(fname)
+            tool_func = compress_pdf
+            tool_args = (input_path, os.path.join(output_dir, out_name), level)
 
         elif tool == 'edit_pdf':
-            files = [f for f in os.listdir(session_dir) if os.path.isfile(os.path.join(session_dir, f))]
-            if not files: return JsonResponse({'error': 'No file'}, status=400)
+            files = _session_files(session_dir, pdf_only=True)
+            if not files: return JsonResponse({'error': 'No PDF found in session'}, status=400)
             
             fname = files[0]
             input_path = os.path.join(session_dir, fname)
             out_name = f"edited_{uuid.uuid4()}.pdf"
-            out_path = os.path.join(output_dir, out_name)
+            task_original_names.append(fname)
             
             # data['pages_config'] should be the list of operations
             pages_config = data.get('pages_config', [])
-            success = edit_pdf(input_path, out_path, pages_config)
-            if success:
-                 task_output_file = f"outputs/{out_name}"
-                 task_original_names.append(fname)
+            tool_func = edit_pdf
+            tool_args = (input_path, os.path.join(output_dir, out_name), pages_config,
+                         _compact_option(data.get('compact')))
         
         elif tool == 'pdf2word':
-             files = [f for f in os.listdir(session_dir) if os.path.isfile(os.path.join(session_dir, f))]
+             files = _session_files(session_dir, pdf_only=True)
+             if not files: return JsonResponse({'error': 'No PDF found in session'}, status=400)
              fname = files[0]
              input_path = os.path.join(session_dir, fname)
              out_name = f"{os.path.splitext(fname)[0]}_{uuid.uuid4()}.docx"
-             out_path = os.path.join(output_dir, out_name)
-             
-             success = pdf_to_word(input_path, out_path)
-             if success:
-                 task_output_file = f"outputs/{out_name}"
-                 task_original_names.append(fname)
+             task_original_names.append(fname)
+             tool_func = pdf_to_word
+             tool_args = (input_path, os.path.join(output_dir, out_name))
 
         elif tool == 'pdf2excel':
-             files = [f for f in os.listdir(session_dir) if os.path.isfile(os.path.join(session_dir, f))]
+             files = _session_files(session_dir, pdf_only=True)
+             if not files: return JsonResponse({'error': 'No PDF found in session'}, status=400)
              fname = files[0]
              input_path = os.path.join(session_dir, fname)
-             out_name = f"{os.path.splitext(fname)[0]}_{uuid.uuid4()}.xlsx"
-             out_path = os.path.join(output_dir, out_name)
-             
-             success = pdf_to_excel(input_path, out_path)
-             if success:
-                 task_output_file = f"outputs/{out_name}"
-                 task_original_names.append(fname)
+             output_format = data.get('format', 'xlsx')
+             if output_format not in ('xlsx', 'csv', 'parquet'):
+                 return JsonResponse({'error': 'Unsupported output format'}, status=400)
+             out_name = f"{os.path.splitext(fname)[0]}_{uuid.uuid4()}.{output_format}"
+             task_original_names.append(fname)
+             tool_func = pdf_to_excel
+             tool_args = (input_path, os.path.join(output_dir, out_name))
                  
         elif tool == 'img2pdf':
              # Similar to merge but with img_to_pdf
              input_paths = []
-             for fname in os.listdir(session_dir):
+             for fname in _session_files(session_dir):
                  input_paths.append(os.path.join(session_dir, fname))
                  task_original_names.append(fname)
              
              out_name = f"images_{uuid.uuid4()}.pdf"
-             out_path = os.path.join(output_dir, out_name)
-             success = img_to_pdf(input_paths, out_path, False)
-             if success:
-                 task_output_file = f"outputs/{out_name}"
+             tool_func = img_to_pdf
+             tool_args = (input_paths, os.path.join(output_dir, out_name), False)
 
+        if tool_func is not None:
+            if _job_mode(request, data):
+                return _start_job(tool, task_original_names, tool_func, tool_args, f"outputs/{out_name}")
+            if tool_func(*tool_args):
+                task_output_file = f"outputs/{out_name}"
 
         if task_output_file:
              task = DocumentTask.objects.create(
@@ -621,6 +1018,76 @@ def api_process_session(request, tool, session_id):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def api_pipeline(request, session_id):
+    """
+    Run several tools over the session PDF in one pass, keeping the document
+    in memory between steps; only the final result is written and recorded.
+    Expects POST with JSON body: { steps: [{tool: ..., ...params}, ...] }
+    A 'merge' step may list session 'files' in order; the first one is the
+    document the pipeline starts from.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        from core.tools.pipeline import PIPELINE_TOOLS
+
+        data = json.loads(request.body)
+        steps = data.get('steps') or []
+        if not isinstance(steps, list) or not steps:
+            return JsonResponse({'error': 'No pipeline steps provided'}, status=400)
+        for step in steps:
+            if not isinstance(step, dict) or step.get('tool') not in PIPELINE_TOOLS:
+                return JsonResponse({'error': f"Unsupported pipeline step: {step}"}, status=400)
+            if step['tool'] == 'compress':
+                step['level'] = _compression_level(step.get('level'))
+                if step['level'] is None:
+                    return _invalid_level_response()
+
+        session_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id)
+        if not os.path.exists(session_dir):
+            return JsonResponse({'error': 'Session expired or invalid'}, status=404)
+        sweeper.touch(session_dir)
+
+        merge_step = next((step for step in steps if step['tool'] == 'merge'), None)
+        if merge_step is not None and merge_step.get('files'):
+            input_names = [f for f in merge_step['files']
+                           if os.path.isfile(os.path.join(session_dir, os.path.basename(f)))]
+        else:
+            input_names = _session_files(session_dir, pdf_only=True)
+            if merge_step is None:
+                input_names = input_names[:1]
+        if not input_names:
+            return JsonResponse({'error': 'No PDF found in session'}, status=400)
+        input_paths = [os.path.join(session_dir, os.path.basename(f)) for f in input_names]
+
+        output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
+        os.makedirs(output_dir, exist_ok=True)
+        out_name = f"pipeline_{uuid.uuid4()}.pdf"
+        output_path = os.path.join(output_dir, out_name)
+
+        if _job_mode(request, data):
+            return _start_job('pipeline', input_names, run_pipeline,
+                              (input_paths, steps, output_path), f"outputs/{out_name}")
+
+        if not run_pipeline(input_paths, steps, output_path):
+            return JsonResponse({'error': 'Processing failed'}, status=500)
+
+        task = DocumentTask.objects.create(
+            task_type='pipeline',
+            status='success',
+            original_filenames=','.join(input_names),
+            output_file=f"outputs/{out_name}"
+        )
+        return JsonResponse({
+            'success': True,
+            'redirect_url': f"/result/{task.id}"
+        })
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 def api_editor_apply(request, session_id):
     """
     Apply annotation layers to a PDF and generate final output.
@@ -630,21 +1097,14 @@ def api_editor_apply(request, session_id):
         return JsonResponse({'error': 'Method not allowed'}, status=405)
     
     try:
-        from core.tools.pdf_flattener import flatten_pdf_with_layers
-        
         data = json.loads(request.body)
         layers = data.get('layers', [])
         
-        session_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id)
-        if not os.path.exists(session_dir):
-            return JsonResponse({'error': 'Session not found'}, status=404)
-        
-        # Get the first PDF in session
-        pdf_files = [f for f in os.listdir(session_dir) if f.lower().endswith('.pdf')]
-        if not pdf_files:
-            return JsonResponse({'error': 'No PDF found in session'}, status=400)
-        
-        input_pdf = os.path.join(session_dir, pdf_files[0])
+        input_pdf, error = _session_pdf(session_id)
+        if error:
+            return error
+        sweeper.touch(os.path.dirname(input_pdf))
+        pdf_name = os.path.basename(input_pdf)
         
         # Generate output path
         output_dir = os.path.join(settings.MEDIA_ROOT, 'outputs')
@@ -652,15 +1112,22 @@ def api_editor_apply(request, session_id):
         output_name = f"edited_{uuid.uuid4()}.pdf"
         output_path = os.path.join(output_dir, output_name)
         
+        # Large files get an incremental update unless a compact rewrite is asked for
+        compact = _compact_option(data.get('compact'))
+        
+        if _job_mode(request, data):
+            return _start_job('edit_pdf', [pdf_name], flatten_pdf_with_layers,
+                              (input_pdf, layers, output_path, compact), f"outputs/{output_name}")
+        
         # Flatten layers
-        success = flatten_pdf_with_layers(input_pdf, layers, output_path)
+        success = flatten_pdf_with_layers(input_pdf, layers, output_path, compact)
         
         if success:
             # Create task record
             task = DocumentTask.objects.create(
                 task_type='edit_pdf',
                 status='success',
-                original_filenames=pdf_files[0],
+                original_filenames=pdf_name,
                 output_file=f"outputs/{output_name}"
             )
             return JsonResponse({
@@ -681,21 +1148,22 @@ def api_analyze_pdf(request, session_id, page_num):
         return JsonResponse({'error': 'Method not allowed'}, status=405)
         
     try:
-        from core.tools.pdf_analyzer import analyze_pdf_text
+        from core.cache import get_cache, file_digest
         
-        session_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id)
-        if not os.path.exists(session_dir):
-            return JsonResponse({'error': 'Session not found'}, status=404)
-            
-        # Get the first PDF in session
-        pdf_files = [f for f in os.listdir(session_dir) if f.lower().endswith('.pdf')]
-        if not pdf_files:
-            return JsonResponse({'error': 'No PDF found in session'}, status=400)
-            
-        input_pdf = os.path.join(session_dir, pdf_files[0])
+        input_pdf, error = _session_pdf(session_id)
+        if error:
+            return error
         
-        # Analyze
-        text_data = analyze_pdf_text(input_pdf, int(page_num))
+        # Pages are cached by content hash, so repeat requests skip PyMuPDF
+        cache = get_cache('analysis')
+        cache_key = f"{ANALYSIS_CACHE_VERSION}:{file_digest(input_pdf)}:{int(page_num)}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            text_data = json.loads(cached)
+        else:
+            text_data = analyze_pdf_text(input_pdf, int(page_num))
+            if text_data is not None:
+                cache.set(cache_key, json.dumps(text_data).encode())
         
         if text_data is None:
              return JsonResponse({'error': 'Failed to analyze text'}, status=500)
@@ -707,4 +1175,240 @@ def api_analyze_pdf(request, session_id, page_num):
         })
             
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500)
+def api_analyze_document(request, session_id):
+    """
+    Analyze every page of the session PDF in one request.
+    Streams NDJSON: a {"type": "document"} line with the page count, then one
+    {"type": "page"} line per page as soon as it is ready (cached pages first,
+    the rest in completion order), then {"type": "done"}.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        import fitz  # PyMuPDF
+        from django.http import StreamingHttpResponse
+        from core.cache import get_cache, file_digest
+
+        input_pdf, error = _session_pdf(session_id)
+        if error:
+            return error
+        with fitz.open(input_pdf) as doc:
+            page_count = len(doc)
+        cache = get_cache('analysis')
+        key_prefix = f"{ANALYSIS_CACHE_VERSION}:{file_digest(input_pdf)}"
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+    def line(obj):
+        return json.dumps(obj).encode() + b'\n'
+
+    def stream():
+        yield line({'type': 'document', 'page_count': page_count})
+        missing = []
+        for page_num in range(1, page_count + 1):
+            cached = cache.get(f"{key_prefix}:{page_num}")
+            if cached is None:
+                missing.append(page_num)
+            else:
+                yield b'{"type": "page", "page": %d, "text_blocks": ' % page_num + cached + b'}\n'
+        try:
+            for page_num, text_data in iter_page_analyses(input_pdf, missing):
+                encoded = json.dumps(text_data).encode()
+                cache.set(f"{key_prefix}:{page_num}", encoded)
+                yield b'{"type": "page", "page": %d, "text_blocks": ' % page_num + encoded + b'}\n'
+        except Exception as e:
+            yield line({'type': 'error', 'error': str(e)})
+            return
+        yield line({'type': 'done'})
+
+    response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+    # Let proxies pass lines through as they are produced
+    response['X-Accel-Buffering'] = 'no'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+# Thumbnails are keyed by content hash, so browsers may reuse them for a day
+THUMBNAIL_MAX_AGE = 24 * 60 * 60
+
+def _thumbnail_options(request):
+    """Read width, rotation and format from the query string; ValueError if invalid."""
+    from core.tools import pdf_thumbnails
+
+    width = int(request.GET.get('width', 200))
+    if not pdf_thumbnails.MIN_WIDTH <= width <= pdf_thumbnails.MAX_WIDTH:
+        raise ValueError(f"width must be between {pdf_thumbnails.MIN_WIDTH} and {pdf_thumbnails.MAX_WIDTH}")
+    rotation = int(request.GET.get('rotation', 0)) % 360
+    if rotation not in pdf_thumbnails.ROTATIONS:
+        raise ValueError("rotation must be a multiple of 90")
+    fmt = request.GET.get('format', 'png').lower().replace('jpg', 'jpeg')
+    if fmt not in pdf_thumbnails.FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(pdf_thumbnails.FORMATS)}")
+    return width, rotation, fmt
+
+def _session_files(session_dir, pdf_only=False):
+    """
+    Names of the files in a session, sorted so every endpoint sees the same
+    order; the first PDF is the session's primary document.
+    """
+    return sorted(
+        f for f in os.listdir(session_dir)
+        if not f.startswith('.') and os.path.isfile(os.path.join(session_dir, f))
+        and (not pdf_only or f.lower().endswith('.pdf'))
+    )
+
+def _session_pdf(session_id):
+    """Path of the session's primary PDF, or a JsonResponse explaining why there is none."""
+    session_dir = os.path.join(settings.MEDIA_ROOT, 'sessions', session_id)
+    if not os.path.exists(session_dir):
+        return None, JsonResponse({'error': 'Session not found'}, status=404)
+    pdf_files = _session_files(session_dir, pdf_only=True)
+    if not pdf_files:
+        return None, JsonResponse({'error': 'No PDF found in session'}, status=400)
+    return os.path.join(session_dir, pdf_files[0]), None
+
+def api_page_thumbnail(request, session_id, page_num):
+    """
+    Render one page of the session PDF as an image.
+    Query parameters: width (pixels, default 200), rotation (degrees), format (png/jpeg).
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        from core.cache import get_cache, file_digest
+        from core.tools.pdf_thumbnails import FORMATS
+
+        try:
+            width, rotation, fmt = _thumbnail_options(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        input_pdf, error = _session_pdf(session_id)
+        if error:
+            return error
+
+        cache = get_cache('thumbnails')
+        cache_key = f"{THUMBNAIL_CACHE_VERSION}:{file_digest(input_pdf)}:{int(page_num)}:{width}:{rotation}:{fmt}"
+        etag = f'"{cache.key(cache_key)[:32]}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=304)
+        else:
+            image = cache.get(cache_key)
+            if image is None:
+                image = render_thumbnail(input_pdf, int(page_num), width, rotation, fmt)
+                if image is None:
+                    return JsonResponse({'error': 'Failed to render page'}, status=404)
+                cache.set(cache_key, image)
+            response = HttpResponse(image, content_type=FORMATS[fmt])
+        response['ETag'] = etag
+        response['Cache-Control'] = f'private, max-age={THUMBNAIL_MAX_AGE}'
+        return response
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+def api_document_thumbnails(request, session_id):
+    """
+    Render every page of the session PDF, spread over the worker pool.
+    Streams NDJSON like api_analyze_document, with each page line carrying
+    the image as a data URI in "src". Takes the api_page_thumbnail parameters.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        import base64
+        import fitz  # PyMuPDF
+        from django.http import StreamingHttpResponse
+        from core.cache import get_cache, file_digest
+        from core.tools.pdf_thumbnails import FORMATS
+
+        try:
+            width, rotation, fmt = _thumbnail_options(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        input_pdf, error = _session_pdf(session_id)
+        if error:
+            return error
+
+        with fitz.open(input_pdf) as doc:
+            page_count = len(doc)
+        cache = get_cache('thumbnails')
+        digest = file_digest(input_pdf)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+    def key(page_num):
+        return f"{THUMBNAIL_CACHE_VERSION}:{digest}:{page_num}:{width}:{rotation}:{fmt}"
+
+    def line(obj):
+        return json.dumps(obj).encode() + b'\n'
+
+    def page_line(page_num, image):
+        src = f"data:{FORMATS[fmt]};base64,{base64.b64encode(image).decode()}"
+        return line({'type': 'page', 'page': page_num, 'src': src})
+
+    def stream():
+        yield line({'type': 'document', 'page_count': page_count})
+        missing = []
+        for page_num in range(1, page_count + 1):
+            image = cache.get(key(page_num))
+            if image is None:
+                missing.append(page_num)
+            else:
+                yield page_line(page_num, image)
+        try:
+            for page_num, image in iter_thumbnails(input_pdf, width, rotation, fmt, missing):
+                cache.set(key(page_num), image)
+                yield page_line(page_num, image)
+        except Exception as e:
+            yield line({'type': 'error', 'error': str(e)})
+            return
+        yield line({'type': 'done'})
+
+    response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+    response['X-Accel-Buffering'] = 'no'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+def api_task_status(request, task_id):
+    """Report the status of a tool job."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+    try:
+        task = DocumentTask.objects.get(pk=task_id)
+    except DocumentTask.DoesNotExist:
+        return JsonResponse({'error': 'Task not found'}, status=404)
+
+    data = {
+        'success': True,
+        'task_id': task.id,
+        'task_type': task.task_type,
+        'status': task.status,
+        'created_at': task.created_at.isoformat(),
+        'finished_at': task.finished_at.isoformat() if task.finished_at else None,
+    }
+    if task.status == 'pending':
+        data['queue_position'] = queue_position(task)
+    elif task.status == 'processing':
+        data['pages_done'] = task.pages_done
+        data['pages_total'] = task.pages_total
+        data['progress'] = round(100 * task.pages_done / task.pages_total) if task.pages_total else None
+    elif task.status == 'success' and task.output_file:
+        data['filename'] = os.path.basename(task.output_file.name)
+        data['url'] = task.output_file.url
+        data['redirect_url'] = f"/result/{task.id}"
+    elif task.status == 'failed':
+        data['error'] = task.error_message
+    return JsonResponse(data)
+
+def metrics_view(request):
+    """Expose tool and request metrics in the Prometheus text format."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.META.get('HTTP_AUTHORIZATION') != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
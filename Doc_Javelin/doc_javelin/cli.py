@@ -3,16 +3,41 @@ Command-line interface for Doc Javelin.
 """
 
 import argparse
+import contextlib
+import glob
+import hashlib
+import json
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
-from doc_javelin.tools import (
-    merge_pdfs,
-    img_to_pdf,
-    pdf_to_word,
-    pdf_to_excel
-)
+try:
+    from doc_javelin.tools import (
+        merge_pdfs,
+        img_to_pdf,
+        pdf_to_word,
+        pdf_to_excel
+    )
+except ModuleNotFoundError:
+    # Run from the Django project, where the tools live in core.tools
+    from core.tools import (
+        merge_pdfs,
+        img_to_pdf,
+        pdf_to_word,
+        pdf_to_excel
+    )
+
+# Per-file commands the batch subcommand can run: input extensions, output extension
+BATCH_COMMANDS = {
+    'pdf2word': (('.pdf',), 'docx'),
+    'pdf2excel': (('.pdf',), 'xlsx'),
+    'img2pdf': (('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp'), 'pdf'),
+}
+
+# Where --skip hash records what each output was made from
+DEFAULT_STATE_FILE = '.doc_javelin_batch.json'
 
 
 def create_parser():
@@ -33,6 +58,9 @@ Examples:
   
   # Convert PDF to Excel
   python -m doc_javelin.cli pdf2excel data.pdf -o output.xlsx
+  
+  # Convert every PDF under a directory to Word, 8 at a time
+  python -m doc_javelin.cli batch pdf2word inbox/ -r -o 'out/{rel}/{stem}.{ext}' --jobs 8
         """
     )
     
@@ -61,9 +89,247 @@ Examples:
     pdf2excel_parser.add_argument('-o', '--output', required=True, help='Output Excel file path (.xlsx)')
     pdf2excel_parser.add_argument('-s', '--sheet', default='Sheet1', help='Excel sheet name')
     
+    # Batch command
+    batch_parser = subparsers.add_parser(
+        'batch', help='Convert many files in one run, in parallel',
+        description='Run pdf2word, pdf2excel or img2pdf on every matching file, one file per worker process.'
+    )
+    batch_parser.add_argument('tool', choices=sorted(BATCH_COMMANDS), help='Conversion to run on each file')
+    batch_parser.add_argument('inputs', nargs='+',
+                              help='Files, directories or glob patterns (quote patterns; ** matches subdirectories)')
+    batch_parser.add_argument('-o', '--output', default='{dir}/{stem}.{ext}',
+                              help='Output path template with {dir}, {rel}, {stem}, {name} and {ext} '
+                                   '(default: {dir}/{stem}.{ext}); {rel} is the input\'s directory '
+                                   'relative to the directory or pattern it was found under')
+    batch_parser.add_argument('-r', '--recursive', action='store_true', help='Descend into subdirectories of directory inputs')
+    batch_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                              help='Number of worker processes (default: all cores)')
+    batch_parser.add_argument('--skip', choices=('never', 'mtime', 'hash'), default='never',
+                              help='Skip files whose output is up to date: newer than the input (mtime), '
+                                   'or made from identical input content (hash)')
+    batch_parser.add_argument('--state', default=DEFAULT_STATE_FILE,
+                              help=f'File recording input hashes for --skip hash (default: {DEFAULT_STATE_FILE})')
+    batch_parser.add_argument('--summary', help="Write a JSON summary of the run to this file ('-' for stdout)")
+    batch_parser.add_argument('-q', '--quiet', action='store_true', help='Do not report progress')
+    batch_parser.add_argument('-s', '--sheet', default='Sheet1', help='Excel sheet name (pdf2excel)')
+    
     return parser
 
 
+def collect_inputs(patterns, extensions, recursive=False):
+    """
+    Expand files, directories and glob patterns into input files.
+    
+    Args:
+        patterns: Paths of files or directories, or glob patterns
+        extensions: File extensions to keep from directories and patterns
+        recursive: Whether directories are searched below their top level
+    
+    Returns:
+        Sorted list of (file path, root) pairs, where root is the directory
+        or fixed part of the pattern the file was found under
+    """
+    found = {}
+    for pattern in patterns:
+        if os.path.isfile(pattern):
+            found.setdefault(os.path.abspath(pattern), (pattern, os.path.dirname(pattern)))
+            continue
+        if os.path.isdir(pattern):
+            root = pattern
+            if recursive:
+                paths = (os.path.join(d, f) for d, _, files in os.walk(pattern) for f in files)
+            else:
+                paths = (os.path.join(pattern, f) for f in os.listdir(pattern))
+        else:
+            # The directories before the first wildcard are the root
+            parts = Path(pattern).parts
+            fixed = next((i for i, part in enumerate(parts) if glob.has_magic(part)), len(parts))
+            root = os.path.join(*parts[:fixed]) if fixed else ''
+            paths = glob.glob(pattern, recursive=True)
+        for path in paths:
+            if os.path.isfile(path) and path.lower().endswith(extensions):
+                found.setdefault(os.path.abspath(path), (path, root))
+    return sorted(found.values())
+
+
+def output_path(template, input_path, root, ext):
+    """Fill in an output path template for one input file."""
+    stem, _ = os.path.splitext(os.path.basename(input_path))
+    rel = os.path.relpath(os.path.dirname(input_path) or '.', root or '.')
+    path = template.format(
+        dir=os.path.dirname(input_path) or '.',
+        rel='' if rel == '.' else rel,
+        stem=stem,
+        name=os.path.basename(input_path),
+        ext=ext,
+    )
+    return os.path.normpath(path)
+
+
+def file_hash(path):
+    """SHA-256 of a file's content, as hex."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _batch_convert(tool, input_path, output, options, known_hash=None):
+    """
+    Convert one file; runs in a worker process.
+    
+    With options['skip'] == 'hash' the input is hashed first, and the
+    conversion is skipped if that matches known_hash (what the existing
+    output was made from). options['workers'] caps the processes a tool
+    may use itself (None: its default).
+    
+    Returns:
+        (status, input hash or None, error or None, seconds), where status
+        is 'converted', 'skipped' or 'failed'
+    """
+    start = time.perf_counter()
+    digest = None
+    try:
+        if options['skip'] == 'hash':
+            digest = file_hash(input_path)
+            if digest == known_hash and os.path.exists(output):
+                return 'skipped', digest, None, time.perf_counter() - start
+        
+        output_dir = os.path.dirname(output)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        # Tool messages go with the progress report, leaving stdout to --summary -
+        with contextlib.redirect_stdout(sys.stderr):
+            if tool == 'pdf2word':
+                success = pdf_to_word(input_path, output, workers=options['workers'])
+            elif tool == 'pdf2excel':
+                success = pdf_to_excel(input_path, output, options['sheet'])
+            else:
+                success = img_to_pdf([input_path], output, workers=options['workers'])
+        
+        if success:
+            return 'converted', digest, None, time.perf_counter() - start
+        return 'failed', digest, 'conversion failed', time.perf_counter() - start
+    except Exception as e:
+        return 'failed', digest, str(e), time.perf_counter() - start
+
+
+def _load_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(path, state):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def run_batch(args):
+    """
+    Run the batch subcommand.
+    
+    Returns:
+        Exit status: 0 if every file was converted or skipped, 1 otherwise
+    """
+    started = time.time()
+    extensions, ext = BATCH_COMMANDS[args.tool]
+    inputs = collect_inputs(args.inputs, extensions, args.recursive)
+    if not inputs:
+        print("✗ No matching input files", file=sys.stderr)
+        return 1
+    
+    jobs = []
+    outputs = {}
+    for input_path, root in inputs:
+        output = output_path(args.output, input_path, root, ext)
+        if output in outputs:
+            print(f"✗ Output template maps both {outputs[output]} and {input_path} to {output}", file=sys.stderr)
+            return 1
+        outputs[output] = input_path
+        jobs.append((input_path, output))
+    
+    options = {'skip': args.skip, 'sheet': args.sheet}
+    state = _load_state(args.state) if args.skip == 'hash' else {}
+    results = []
+    
+    def record(input_path, output, status, digest, error, seconds):
+        results.append({
+            'input': input_path,
+            'output': output,
+            'status': status,
+            'seconds': round(seconds, 3),
+            **({'error': error} if error else {}),
+        })
+        if digest and status != 'failed':
+            state[os.path.abspath(output)] = {'tool': args.tool, 'sha256': digest}
+        if not args.quiet:
+            mark = {'converted': '✓', 'skipped': '-', 'failed': '✗'}[status]
+            detail = f" ({error})" if error else (" (up to date)" if status == 'skipped' else f" ({seconds:.1f}s)")
+            width = len(str(len(jobs)))
+            print(f"[{len(results):>{width}}/{len(jobs)}] {mark} {input_path} -> {output}{detail}", file=sys.stderr)
+    
+    pending = []
+    for input_path, output in jobs:
+        if args.skip == 'mtime' and os.path.exists(output) \
+                and os.path.getmtime(output) >= os.path.getmtime(input_path):
+            record(input_path, output, 'skipped', None, None, 0.0)
+            continue
+        known = state.get(os.path.abspath(output), {})
+        pending.append((input_path, output, known.get('sha256') if known.get('tool') == args.tool else None))
+    
+    parallel = args.jobs > 1 and len(pending) > 1
+    # A parallel batch already uses every core, so each tool keeps to one process
+    options['workers'] = 1 if parallel else None
+    
+    executor = None
+    try:
+        if not parallel:
+            for input_path, output, known_hash in pending:
+                record(input_path, output, *_batch_convert(args.tool, input_path, output, options, known_hash))
+        else:
+            executor = ProcessPoolExecutor(max_workers=min(args.jobs, len(pending)))
+            futures = {
+                executor.submit(_batch_convert, args.tool, input_path, output, options, known_hash): (input_path, output)
+                for input_path, output, known_hash in pending
+            }
+            for future in as_completed(futures):
+                record(*futures[future], *future.result())
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        # Saved even when interrupted, so a rerun skips what was finished
+        if args.skip == 'hash':
+            _save_state(args.state, state)
+    
+    counts = {status: sum(r['status'] == status for r in results) for status in ('converted', 'skipped', 'failed')}
+    if args.summary:
+        summary = {
+            'tool': args.tool,
+            'total': len(jobs),
+            **counts,
+            'jobs': args.jobs,
+            'seconds': round(time.time() - started, 3),
+            'files': sorted(results, key=lambda r: r['input']),
+        }
+        if args.summary == '-':
+            json.dump(summary, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.summary, 'w') as f:
+                json.dump(summary, f, indent=2)
+    
+    message = (f"{counts['converted']} converted, {counts['skipped']} skipped, {counts['failed']} failed "
+               f"in {time.time() - started:.1f}s")
+    print(f"{'✗' if counts['failed'] else '✓'} {message}", file=sys.stderr)
+    return 1 if counts['failed'] else 0
+
+
 def main():
     """Main CLI entry point."""
     parser = create_parser()
@@ -109,6 +375,9 @@ def main():
                 print("✗ Failed to convert PDF to Excel")
                 sys.exit(1)
         
+        elif args.command == 'batch':
+            sys.exit(run_batch(args))
+        
     except KeyboardInterrupt:
         print("\n✗ Operation cancelled by user")
         sys.exit(1)